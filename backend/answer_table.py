@@ -0,0 +1,230 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import get_args
+
+# Allow `python backend/answer_table.py` as well as `python -m backend.answer_table`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.event_loop import maybe_await
+from backend.knowledge_base import load_champion_names
+from backend.schemas import StrategicMechanic, ValidArchetype, ValidPosition
+from backend.tracing import get_tracer
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+
+# Every lane plus "no lane filter"
+LANES = [None] + list(get_args(ValidPosition))
+
+# Counter picks are materialized at the limit the pipeline asks for; larger limits go live
+COUNTER_LIMIT = 3
+
+def table_path():
+    return os.getenv("ANSWER_TABLE_PATH", os.path.join(CACHE_DIR, 'answer_table.json'))
+
+def table_enabled():
+    """ANSWER_TABLE=0 turns the table off and every lookup runs live."""
+    return os.getenv("ANSWER_TABLE", "1").lower() not in ("0", "false", "no")
+
+def _lane(position):
+    # The queries treat "" like no lane filter; both share one table slot
+    return position or ""
+
+async def materialize(graph, version, concurrency=8):
+    """Runs every lookup of the closed query space against `graph` and returns the table.
+
+    Champions x lanes for counter picks, mechanics x lanes and archetypes x lanes.
+    """
+    slots = asyncio.Semaphore(concurrency)
+    table = {"version": version, "counter_limit": COUNTER_LIMIT, "counter_picks": {}, "mechanic_holders": {}, "archetype_counters": {}}
+
+    async def fill(section, key, lane, lookup):
+        async with slots:
+            rows = await maybe_await(lookup())
+        table[section].setdefault(key, {})[_lane(lane)] = rows
+
+    jobs = []
+    for lane in LANES:
+        for name in load_champion_names():
+            jobs.append(fill("counter_picks", name, lane, lambda name=name, lane=lane: graph.get_counter_picks(name, lane, COUNTER_LIMIT)))
+        for mechanic in get_args(StrategicMechanic):
+            jobs.append(fill("mechanic_holders", mechanic, lane, lambda mechanic=mechanic, lane=lane: graph.find_mechanic_holders(mechanic, lane)))
+        for archetype in get_args(ValidArchetype):
+            jobs.append(fill("archetype_counters", archetype, lane, lambda archetype=archetype, lane=lane: graph.get_archetype_counters(archetype, lane)))
+    await asyncio.gather(*jobs)
+    return table
+
+def entry_count(table):
+    return sum(len(lanes) for section in ("counter_picks", "mechanic_holders", "archetype_counters") for lanes in table[section].values())
+
+def save_table(table, path=None):
+    path = path or table_path()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # Every worker may rebuild at once; each writes its own temp file and the last replace wins
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp', delete=False) as f:
+        tmp_path = f.name
+        try:
+            json.dump(table, f, separators=(',', ':'))
+        except BaseException:
+            f.close()
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, path)
+
+def load_table(path=None, version=None):
+    """The saved table when it exists and was built for `version`, else None."""
+    path = path or table_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            table = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring answer table {path}: {e}")
+        return None
+    return table if version is None or table.get("version") == version else None
+
+class AnswerTableRetriever:
+    """Serves counter picks, mechanic holders and archetype counters from a precomputed table.
+
+    The table is stamped with the KB version of the graph it was built from. The graph's
+    :KnowledgeBase version is re-read every `check_interval` seconds off the request path;
+    a mismatch drops the table, so lookups run live until the rebuild finishes. Anything
+    outside the table (unknown names, larger limits, batches, drafts) goes to the graph.
+    """
+    def __init__(self, graph, path=None, check_interval=None):
+        self.graph = graph
+        self.path = path or table_path()
+        self.check_interval = check_interval if check_interval is not None else float(os.getenv("ANSWER_TABLE_CHECK_SECONDS", "60"))
+        self.table = None
+        self.checked_at = None
+        self._refresh_task = None
+        self._refresh_lock = None
+        self.metrics = {"hits": 0, "misses": 0, "builds": 0, "invalidations": 0}
+
+    async def close(self):
+        await maybe_await(self.graph.close())
+
+    async def warm(self):
+        if hasattr(self.graph, "warm"):
+            await maybe_await(self.graph.warm())
+        await self.refresh()
+
+    async def refresh(self):
+        """Loads, or builds and saves, the table for the graph's current KB version."""
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        async with self._refresh_lock:
+            self.checked_at = time.monotonic()
+            version = await self.graph.kb_version()
+            if self.table is not None and self.table["version"] == version:
+                return
+            if self.table is not None:
+                self.metrics["invalidations"] += 1
+                self.table = None
+            if version is None:
+                print("⚠️ The graph has no :KnowledgeBase version; serving live until it is reseeded")
+                return
+
+            table = load_table(self.path, version)
+            if table is None:
+                start = time.perf_counter()
+                with get_tracer().span("answer_table.build", version=version) as span:
+                    table = await materialize(self.graph, version)
+                    span.set(entries=entry_count(table))
+                save_table(table, self.path)
+                self.metrics["builds"] += 1
+                print(f"✅ Answer table ({entry_count(table)} entries, KB {version}) built in {time.perf_counter() - start:.1f}s")
+            self.table = table
+
+    async def _refresh_quietly(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"⚠️ Answer table refresh failed: {e}")
+
+    def _lookup(self, section, key, position):
+        # The version check is scheduled, never awaited, so a hit stays a dictionary lookup
+        stale = self.checked_at is None or time.monotonic() - self.checked_at >= self.check_interval
+        if stale and (self._refresh_task is None or self._refresh_task.done()):
+            self.checked_at = time.monotonic()
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_quietly())
+        if self.table is None:
+            return None
+        return self.table[section].get(key, {}).get(_lane(position))
+
+    def _served(self, rows):
+        self.metrics["hits" if rows is not None else "misses"] += 1
+        return rows
+
+    async def get_counter_picks(self, enemy_name, position=None, limit=2):
+        rows = self._lookup("counter_picks", enemy_name, position)
+        if rows is not None and limit > self.table["counter_limit"]:
+            rows = None
+        if self._served(rows) is None:
+            return await maybe_await(self.graph.get_counter_picks(enemy_name, position, limit))
+        return [dict(row) for row in rows[:limit]]
+
+    async def find_mechanic_holders(self, mechanic_name, position=None):
+        rows = self._served(self._lookup("mechanic_holders", mechanic_name, position))
+        if rows is None:
+            return await maybe_await(self.graph.find_mechanic_holders(mechanic_name, position))
+        return [dict(row) for row in rows]
+
+    async def get_archetype_counters(self, target_archetype, position=None):
+        rows = self._served(self._lookup("archetype_counters", target_archetype, position))
+        if rows is None:
+            return await maybe_await(self.graph.get_archetype_counters(target_archetype, position))
+        return [dict(row) for row in rows]
+
+    async def get_counter_picks_batch(self, pairs, limit=2):
+        return await maybe_await(self.graph.get_counter_picks_batch(pairs, limit))
+
+    async def get_draft_picks(self, enemy_names, open_roles=None, excluded=None, limit=3, joint=False):
+        return await maybe_await(self.graph.get_draft_picks(enemy_names, open_roles, excluded, limit, joint))
+
+    async def kb_version(self):
+        return await self.graph.kb_version()
+
+    def stats(self):
+        table = {
+            **self.metrics,
+            "version": self.table["version"] if self.table is not None else None,
+            "entries": entry_count(self.table) if self.table is not None else 0,
+        }
+        inner = self.graph.stats() if hasattr(self.graph, "stats") else {}
+        return {**inner, "answer_table": table}
+
+def with_answer_table(graph):
+    return AnswerTableRetriever(graph) if table_enabled() else graph
+
+async def abuild_answer_table(path=None):
+    """Materializes the table from the seeded graph (run after graph_builder stamps the version)."""
+    from backend.graph_retriever import AsyncGraphRetriever
+    graph = AsyncGraphRetriever()
+    try:
+        version = await graph.kb_version()
+        if version is None:
+            raise RuntimeError("the graph has no :KnowledgeBase version; run graph_builder.py first")
+        start = time.perf_counter()
+        table = await materialize(graph, version)
+        save_table(table, path)
+        print(f"Answer table ({entry_count(table)} entries, KB {version}) written to {path or table_path()} "
+              f"in {time.perf_counter() - start:.1f}s")
+        return table
+    finally:
+        await graph.close()
+
+def build_answer_table(path=None):
+    return asyncio.run(abuild_answer_table(path))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute every counter-pick, mechanic and archetype answer per lane from the seeded graph.")
+    parser.add_argument("--output", help="Table path (default: ANSWER_TABLE_PATH or backend/.cache/answer_table.json)")
+    args = parser.parse_args()
+
+    build_answer_table(args.output)
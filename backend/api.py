@@ -0,0 +1,172 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+from contextlib import asynccontextmanager
+from typing import List, Literal, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+# Allow `python backend/api.py` as well as `python -m backend.api`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.graph_retriever import Switchboard, build_async_graph_retriever
+from backend.responder import Responder
+from backend.schemas import ValidPosition, StrategicMechanic, ValidArchetype
+from backend.event_loop import maybe_await
+from backend.tracing import get_tracer
+from backend.warmup import awarm_services
+from backend.tool_agent import ToolAgent, pipeline_mode
+
+class QueryRequest(BaseModel):
+    query: str = Field(..., min_length=1)
+    # Overrides RESPONDER_MODE for this request: template answers skip Gemini entirely
+    responder: Optional[Literal["llm", "template", "auto"]] = None
+
+class CounterPickBatchRequest(BaseModel):
+    # Up to a full enemy team, two lanes each; the whole list runs as one UNWIND
+    pairs: List[Tuple[str, Optional[ValidPosition]]] = Field(..., min_length=1, max_length=10)
+    limit: int = Field(2, ge=1, le=20)
+
+@asynccontextmanager
+async def lifespan(app):
+    # One Neo4j driver (with its connection pool) and one Gemini client per worker process,
+    # created on the worker's own event loop and shared by every request it serves
+    app.state.switchboard = Switchboard()
+    app.state.graph = build_async_graph_retriever()
+    app.state.responder = Responder()
+    # PIPELINE_MODE=tools answers in one tool-calling session instead of classify -> respond
+    app.state.agent = ToolAgent(app.state.switchboard, app.state.responder) if pipeline_mode() == "tools" else None
+    # Connect in the background so the worker accepts traffic (and /health) straight away
+    warmup = asyncio.create_task(awarm_services(app.state.graph))
+    yield
+    warmup.cancel()
+    await maybe_await(app.state.graph.close())
+
+app = FastAPI(title="GraphLeague API", lifespan=lifespan)
+
+def routed_payload(routed):
+    return {
+        "intent": routed.intent.model_dump() if routed.intent is not None else None,
+        "context": routed.context,
+        "graph_data": routed.graph_data,
+        "trace_id": routed.trace_id,
+        "suggestions": routed.suggestions,
+        "suggestion_text": routed.suggestion_text,
+    }
+
+def canonical_champion(request, raw):
+    resolver = request.app.state.switchboard.name_resolver
+    if resolver is None:
+        return raw
+    resolution = resolver.resolve(raw)
+    if resolution.name is None:
+        raise HTTPException(404, detail={"error": f"Unknown champion '{raw}'", "suggestions": resolution.suggestions})
+    return resolution.name
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+@app.get("/stats")
+async def stats(request: Request):
+    sb = request.app.state.switchboard
+    responder = request.app.state.responder
+    return {
+        "worker_pid": os.getpid(),
+        "local_parser": sb.local_parser.stats() if sb.local_parser is not None else None,
+        "intent_cache": sb.intent_cache.stats() if sb.intent_cache is not None else None,
+        "response_cache": responder.response_cache.stats() if responder.response_cache is not None else None,
+        "name_resolver": sb.name_resolver.stats() if sb.name_resolver is not None else None,
+        "gateway": sb.gateway.stats(),
+        "tool_agent": request.app.state.agent.stats() if request.app.state.agent is not None else None,
+        "responder": responder.stats(),
+        "graph": request.app.state.graph.stats() if hasattr(request.app.state.graph, "stats") else None,
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Per worker process: scrape each worker, or run with --workers 1 behind the scraper
+    return get_tracer().render_prometheus()
+
+@app.post("/classify")
+async def classify(body: QueryRequest, request: Request):
+    intent = await request.app.state.switchboard.aclassify_intent(body.query)
+    return {"intent": intent.model_dump() if intent is not None else None}
+
+@app.get("/counter-picks")
+async def counter_picks(request: Request, enemy: str, position: Optional[ValidPosition] = None, limit: int = Query(3, ge=1, le=20)):
+    return await maybe_await(request.app.state.graph.get_counter_picks(canonical_champion(request, enemy), position, limit))
+
+@app.post("/counter-picks/batch")
+async def counter_picks_batch(body: CounterPickBatchRequest, request: Request):
+    pairs = [(canonical_champion(request, enemy), position) for enemy, position in body.pairs]
+    return await maybe_await(request.app.state.graph.get_counter_picks_batch(pairs, body.limit))
+
+@app.get("/mechanic-holders")
+async def mechanic_holders(request: Request, mechanic: StrategicMechanic, position: Optional[ValidPosition] = None):
+    return await maybe_await(request.app.state.graph.find_mechanic_holders(mechanic, position))
+
+@app.get("/archetype-counters")
+async def archetype_counters(request: Request, archetype: ValidArchetype, position: Optional[ValidPosition] = None):
+    return await maybe_await(request.app.state.graph.get_archetype_counters(archetype, position))
+
+@app.post("/answer")
+async def answer(body: QueryRequest, request: Request):
+    state = request.app.state
+    if state.agent is not None:
+        routed, stream = await state.agent.aanswer(body.query, state.graph, mode=body.responder)
+        payload = routed_payload(routed)
+        payload["answer"] = None
+        if stream is not None:
+            async for _ in stream:
+                pass
+            payload["answer"] = stream.text or None
+        payload["spans"] = get_tracer().spans_for(routed.trace_id)
+        return payload
+
+    routed = await state.switchboard.aroute(body.query, state.graph)
+    payload = routed_payload(routed)
+    payload["answer"] = None
+    if routed.graph_data != "NA" and not routed.suggestions:
+        response = await state.responder.agenerate_response(routed.graph_data, routed.context, body.query, intent=routed.intent, trace_id=routed.trace_id, mode=body.responder)
+        payload["answer"] = response.text if response is not None else None
+    payload["spans"] = get_tracer().spans_for(routed.trace_id)
+    return payload
+
+@app.post("/answer/stream")
+async def answer_stream(body: QueryRequest, request: Request):
+    """NDJSON: one `route` event with the graph rows, then `chunk` events, then `done` (with the trace's spans)."""
+    state = request.app.state
+
+    async def events():
+        if state.agent is not None:
+            routed, stream = await state.agent.aanswer(body.query, state.graph, mode=body.responder)
+        else:
+            routed, stream = await state.switchboard.aroute(body.query, state.graph), None
+        yield json.dumps({"type": "route", **routed_payload(routed)}) + "\n"
+        if routed.graph_data == "NA" or routed.suggestions:
+            yield json.dumps({"type": "done", "timings": None, "spans": get_tracer().spans_for(routed.trace_id)}) + "\n"
+            return
+
+        if stream is None:
+            stream = state.responder.stream_response(routed.graph_data, routed.context, body.query, intent=routed.intent, trace_id=routed.trace_id, mode=body.responder)
+        async for chunk in stream:
+            yield json.dumps({"type": "chunk", "text": chunk}) + "\n"
+        yield json.dumps({"type": "done", "timings": stream.timings(), "prompt": stream.prompt_stats, "spans": get_tracer().spans_for(routed.trace_id)}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the GraphLeague query API.")
+    parser.add_argument("--host", default=os.getenv("API_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("API_WORKERS", "4")),
+                        help="Worker processes; each holds its own Neo4j pool and Gemini client")
+    args = parser.parse_args()
+
+    uvicorn.run("backend.api:app", host=args.host, port=args.port, workers=args.workers)
@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from backend import user_intent
+from backend.local_intent import fold
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+
+class PersistentLRUCache:
+    """Bounded in-memory LRU with TTL, optionally backed by a SQLite table that survives restarts.
+
+    Values must be JSON-serializable. Memory misses fall through to disk and are promoted on hit.
+    """
+    def __init__(self, name, max_entries=512, ttl=None, db_path=None, max_disk_entries=10000):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.metrics = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} (key TEXT PRIMARY KEY, value TEXT, expires_at REAL, last_used REAL)"
+            )
+            self._db.commit()
+
+    def _expiry(self):
+        return time.time() + self.ttl if self.ttl else None
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.metrics["hits"] += 1
+                    self.metrics["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+                self.metrics["expired"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(f"SELECT value, expires_at FROM {self.name} WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value, expires_at = json.loads(row[0]), row[1]
+                    if expires_at is None or expires_at > now:
+                        self._db.execute(f"UPDATE {self.name} SET last_used = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, expires_at, value)
+                        self.metrics["hits"] += 1
+                        self.metrics["disk_hits"] += 1
+                        return value
+                    self._db.execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+                    self._db.commit()
+                    self.metrics["expired"] += 1
+
+            self.metrics["misses"] += 1
+            return None
+
+    def set(self, key, value):
+        expires_at = self._expiry()
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._db is not None:
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO {self.name} (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), expires_at, time.time()),
+                )
+                self._evict_disk()
+                self._db.commit()
+
+    def _remember(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.metrics["evictions"] += 1
+
+    def _evict_disk(self):
+        # Drop expired rows, then the least recently used ones beyond the size cap
+        self._db.execute(f"DELETE FROM {self.name} WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        (count,) = self._db.execute(f"SELECT COUNT(*) FROM {self.name}").fetchone()
+        if count > self.max_disk_entries:
+            self._db.execute(
+                f"DELETE FROM {self.name} WHERE key IN (SELECT key FROM {self.name} ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_disk_entries,),
+            )
+            self.metrics["evictions"] += count - self.max_disk_entries
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self.name}")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.metrics["hits"] + self.metrics["misses"]
+            return {
+                **self.metrics,
+                "size": len(self._memory),
+                "hit_rate": round(self.metrics["hits"] / lookups, 3) if lookups else 0.0,
+            }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+class IntentCache:
+    """Caches validated Router choices keyed on a normalized form of the user query."""
+    def __init__(self, local_parser=None, max_entries=None, ttl=None, db_path=None):
+        self.local_parser = local_parser
+        self.store = PersistentLRUCache(
+            "intents",
+            max_entries=max_entries or int(os.getenv("INTENT_CACHE_SIZE", "1024")),
+            ttl=ttl if ttl is not None else float(os.getenv("INTENT_CACHE_TTL", str(7 * 24 * 3600))),
+            db_path=db_path or os.getenv("INTENT_CACHE_PATH", os.path.join(CACHE_DIR, 'intent_cache.sqlite')),
+        )
+
+    def normalize(self, user_query):
+        """Case/whitespace/punctuation folding, with champion mentions folded to their canonical name."""
+        if self.local_parser is None:
+            return fold(user_query)
+        parts = []
+        for kind, value in self.local_parser.tag(user_query):
+            parts.append(fold(value) if kind == "champion" else value if kind == "word" else f"{kind}:{value}")
+        return re.sub(r"\s+", " ", " ".join(parts)).strip()
+
+    def get(self, user_query):
+        payload = self.store.get(self.normalize(user_query))
+        if payload is None:
+            return None
+        return user_intent.Router(choice=payload).choice
+
+    def set(self, user_query, intent):
+        self.store.set(self.normalize(user_query), intent.model_dump())
+
+    def stats(self):
+        return self.store.stats()
+
+    def close(self):
+        self.store.close()
+
+@dataclass
+class CachedResponse:
+    # Stands in for the Gemini response object; callers only read .text
+    text: str
+
+class ResponseCache:
+    """Caches generated answers keyed on (intent, context, graph_data, KB version).
+
+    Concurrent requests for the same key share one in-flight generation. Coalescing is per
+    event loop, which is the shared loop for the sync API.
+    """
+    def __init__(self, kb_version, max_entries=None, ttl=None, db_path=None):
+        self.kb_version = kb_version
+        self.store = PersistentLRUCache(
+            "responses",
+            max_entries=max_entries or int(os.getenv("RESPONSE_CACHE_SIZE", "256")),
+            ttl=ttl if ttl is not None else float(os.getenv("RESPONSE_CACHE_TTL", str(24 * 3600))),
+            # Memory only unless a path is configured
+            db_path=db_path or os.getenv("RESPONSE_CACHE_PATH"),
+        )
+        self._inflight = {}  # key -> Future resolving to the answer text
+        self.coalesced = 0
+
+    def key(self, intent, context, graph_data):
+        payload = {
+            "intent": intent.model_dump() if intent is not None else None,
+            "context": context,
+            "graph_data": graph_data,
+            "kb_version": self.kb_version,
+        }
+        encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, text):
+        if text:
+            self.store.set(key, text)
+
+    async def get_or_generate(self, key, generate):
+        """Returns the cached answer, awaits an identical in-flight request, or awaits generate()."""
+        text = self.store.get(key)
+        if text is not None:
+            return CachedResponse(text)
+
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            text = await asyncio.shield(flight)
+            return CachedResponse(text) if text is not None else None
+
+        flight = self._inflight[key] = asyncio.get_running_loop().create_future()
+        text = None
+        try:
+            response = await generate()
+            if response is not None and response.text:
+                text = response.text
+                self.store.set(key, text)
+            return response
+        finally:
+            del self._inflight[key]
+            flight.set_result(text)
+
+    def stats(self):
+        return {**self.store.stats(), "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+    def close(self):
+        self.store.close()
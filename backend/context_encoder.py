@@ -0,0 +1,117 @@
+import json
+import math
+import os
+import re
+from dataclasses import dataclass
+
+# Rough Gemini tokenizer ratio for English prose; only used to enforce the budget before sending.
+# The real prompt token count comes back in the response's usage metadata.
+CHARS_PER_TOKEN = 4
+
+# Draft reasons are prefixed with the enemy they apply to: "vs Lee Sin: Stat-checks and out-brawls"
+ENEMY_PREFIX = re.compile(r"^vs ([^:]+): (.*)$", re.S)
+
+# Reason texts are cut to this many characters, then shorter, when dropping rows alone can't meet the budget
+REASON_LIMITS = (None, 240, 120, 60)
+
+def approx_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def default_budget():
+    """CONTEXT_TOKEN_BUDGET caps the encoded graph rows; 0 disables the cap."""
+    return int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+
+@dataclass
+class EncodedContext:
+    text: str
+    tokens: int
+    rows: int
+    rows_total: int
+    reasons: int
+
+    @property
+    def truncated(self):
+        return self.rows < self.rows_total
+
+    def stats(self):
+        return {"context_tokens": self.tokens, "context_rows": self.rows, "context_rows_total": self.rows_total, "context_reasons": self.reasons}
+
+def _cell(value):
+    return str(value).replace("|", "/").replace("\n", " ")
+
+def _clip(text, limit):
+    return text if limit is None or len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+def _table(rows, reason_limit):
+    """Pipe table of the rows; list fields become references into one deduplicated reason legend."""
+    columns = []
+    for row in rows:
+        columns.extend(key for key in row if key not in columns)
+    list_columns = [key for key in columns if any(isinstance(row.get(key), list) for row in rows)]
+
+    legend = {}  # reason text -> "R<n>"
+    lines = []
+    for row in rows:
+        cells = []
+        for key in columns:
+            value = row.get(key)
+            if key not in list_columns:
+                cells.append(_cell(value) if value is not None else "-")
+                continue
+            refs = []
+            for item in value or []:
+                item = str(item)
+                match = ENEMY_PREFIX.match(item)
+                enemy, reason = match.groups() if match else (None, item)
+                ref = legend.setdefault(_clip(reason, reason_limit), f"R{len(legend) + 1}")
+                refs.append(f"{enemy}:{ref}" if enemy else ref)
+            cells.append(" ".join(refs) or "-")
+        lines.append(" | ".join(cells))
+
+    header = " | ".join(columns)
+    reasons = [f"{ref} {_cell(reason)}" for reason, ref in legend.items()]
+    text = "\n".join((["Reasons:"] + reasons + [""] if reasons else []) + [header] + lines)
+    return text, len(legend)
+
+def _priority(rows):
+    # Highest score first; rows without a score keep their retriever order
+    return sorted(range(len(rows)), key=lambda i: (-(rows[i].get("Score") or 0) if isinstance(rows[i].get("Score"), (int, float)) else 0, i))
+
+def encode_rows(rows, budget=None):
+    """Encodes a list of graph rows within `budget` tokens, keeping the highest-scoring rows."""
+    budget = default_budget() if budget is None else budget
+    if not rows:
+        return EncodedContext("(no rows)", approx_tokens("(no rows)"), 0, 0, 0)
+
+    order = _priority(rows)
+
+    def encode(keep, reason_limit):
+        kept = sorted(order[:keep])  # back in retriever order for display
+        text, reasons = _table([rows[i] for i in kept], reason_limit)
+        return EncodedContext(text, approx_tokens(text), keep, len(rows), reasons)
+
+    best = None
+    for reason_limit in REASON_LIMITS:
+        full = encode(len(rows), reason_limit)
+        if not budget or full.tokens <= budget:
+            return full
+        # Size only grows with the row count, so binary search the most rows that fit
+        low, high = 1, len(rows) - 1
+        while low <= high:
+            mid = (low + high) // 2
+            candidate = encode(mid, reason_limit)
+            if candidate.tokens <= budget:
+                best, low = candidate, mid + 1
+            else:
+                high = mid - 1
+        if best is not None:
+            return best
+    # Even the best row with clipped reasons is over budget: send it anyway rather than nothing
+    return encode(1, REASON_LIMITS[-1])
+
+def encode_context(graph_data, budget=None):
+    """Compact, budgeted text for Responder prompts from a retriever result."""
+    if isinstance(graph_data, list) and all(isinstance(row, dict) for row in graph_data):
+        return encode_rows(graph_data, budget)
+    text = json.dumps(graph_data, separators=(",", ":"), default=str)
+    return EncodedContext(text, approx_tokens(text), 1, 1, 0)
@@ -0,0 +1,111 @@
+import numpy as np
+from backend.memory_retriever import ROLES
+
+class DraftOptimizer:
+    """Scores every candidate against a whole enemy team at once from the matchup matrix.
+
+    Offense/defense are summed over the enemy rows in one vectorized step, so a full
+    re-evaluation after each pick or ban costs microseconds.
+    """
+    def __init__(self, engine):
+        # engine is an InMemoryGraphRetriever: matchup matrix plus the per-pair reason indexes
+        self.engine = engine
+        self.matchups = engine.matchups
+
+    def score(self, enemy_names, excluded=()):
+        enemies = [self.matchups.index[name] for name in enemy_names if name in self.matchups.index]
+        offense = self.matchups.offense[enemies].sum(axis=0)
+        defense = self.matchups.defense[enemies].sum(axis=0)
+
+        available = np.ones(len(self.matchups.names), dtype=bool)
+        for name in list(enemy_names) + list(excluded):
+            idx = self.matchups.index.get(name)
+            if idx is not None:
+                available[idx] = False
+        return enemies, offense, defense, offense - defense, available
+
+    def _ranked(self, net, offense, mask):
+        candidates = np.flatnonzero(mask)
+        order = np.lexsort((self.matchups.name_rank[candidates], -offense[candidates], -net[candidates]))
+        return candidates[order]
+
+    def top_per_role(self, enemy_names, roles=None, excluded=(), k=3):
+        """Returns {role: [candidate index, ...]} with the k best picks for each open role."""
+        enemies, offense, _, net, available = self.score(enemy_names, excluded)
+        if not enemies:
+            return {}
+        return {
+            role: self._ranked(net, offense, available & self.matchups.lane_mask(role))[:k].tolist()
+            for role in (roles or ROLES)
+        }
+
+    def best_assignment(self, enemy_names, roles=None, excluded=(), beam=8):
+        """Best set of distinct champions, one per open role, maximizing the summed net score.
+
+        Branch and bound over the top `beam` candidates of each role.
+        """
+        enemies, offense, _, net, available = self.score(enemy_names, excluded)
+        if not enemies:
+            return {}
+        roles = list(roles or ROLES)
+        options = [self._ranked(net, offense, available & self.matchups.lane_mask(role))[:beam].tolist() for role in roles]
+        # Upper bound for the roles not yet assigned: each role's best remaining option
+        best_rest = [sum(int(net[opts[0]]) for opts in options[i:] if opts) for i in range(len(options) + 1)]
+
+        best = {"score": None, "picks": []}
+
+        def search(i, taken, picks, total):
+            if best["score"] is not None and total + best_rest[i] <= best["score"]:
+                return
+            if i == len(roles):
+                best["score"], best["picks"] = total, list(picks)
+                return
+            placed = False
+            for idx in options[i]:
+                if idx in taken:
+                    continue
+                placed = True
+                taken.add(idx)
+                picks.append(idx)
+                search(i + 1, taken, picks, total + int(net[idx]))
+                picks.pop()
+                taken.discard(idx)
+            if not placed:
+                # No one left for this role; leave it open rather than fail the whole draft
+                picks.append(None)
+                search(i + 1, taken, picks, total)
+                picks.pop()
+
+        search(0, set(), [], 0)
+        return {role: [idx] for role, idx in zip(roles, best["picks"]) if idx is not None}
+
+    def rows(self, enemy_names, picks_by_role):
+        """Card-shaped rows: per-enemy reasons are prefixed with the enemy they apply to."""
+        enemies, offense, defense, net, _ = self.score(enemy_names)
+        rows = []
+        for role, picks in picks_by_role.items():
+            for idx in picks:
+                pros, cons = [], []
+                for enemy in enemies:
+                    enemy_name = self.matchups.names[enemy]
+                    _, reasons = self.engine.score_pair(idx, enemy)
+                    pros.extend(f"vs {enemy_name}: {reason}" for reason in reasons)
+                    _, risks = self.engine.score_pair(enemy, idx)
+                    cons.extend(f"vs {enemy_name}: {risk}" for risk in risks)
+                rows.append({
+                    "Champion": self.matchups.names[idx],
+                    "Role": role,
+                    "Score": int(net[idx]),
+                    "Offense": int(offense[idx]),
+                    "Defense": int(defense[idx]),
+                    "Reasoning": pros,
+                    "Risks": cons,
+                })
+        return rows
+
+    def draft(self, enemy_names, open_roles=None, excluded=(), limit=3, joint=False):
+        if joint:
+            picks = self.best_assignment(enemy_names, open_roles, excluded)
+        else:
+            picks = self.top_per_role(enemy_names, open_roles, excluded, k=limit)
+        return self.rows(enemy_names, picks)
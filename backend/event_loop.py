@@ -0,0 +1,53 @@
+import asyncio
+import inspect
+import threading
+
+# One event loop per process, run on a daemon thread. The sync APIs submit their
+# coroutines here, so blocking callers share the loop's I/O instead of each
+# holding a connection and a thread for the whole LLM -> graph -> LLM chain.
+_loop = None
+_lock = threading.Lock()
+
+_DONE = object()
+
+def get_loop():
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="graphleague-loop", daemon=True).start()
+        return _loop
+
+def run_sync(coro):
+    """Runs a coroutine on the shared loop and blocks the calling thread for its result."""
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() called from the shared event loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+def iterate_sync(async_iterable):
+    """Drives an async iterator from sync code, one item per round trip to the shared loop."""
+    iterator = async_iterable.__aiter__()
+
+    async def next_item():
+        try:
+            return await iterator.__anext__()
+        except StopAsyncIteration:
+            return _DONE
+
+    while True:
+        item = run_sync(next_item())
+        if item is _DONE:
+            return
+        yield item
+
+async def maybe_await(value):
+    # Lets async code call both async retrievers and the in-memory (sync) one
+    if inspect.isawaitable(value):
+        return await value
+    return value
@@ -1,17 +1,13 @@
+import argparse
 import json
 import os
-from neo4j import GraphDatabase
+import sys
+import time
 from dotenv import load_dotenv
-from schemas import ChampionNode
 
-load_dotenv()
-neo4j_uri = os.getenv("NEO4J_URI", "bolt://neo4j:7687")
-neo4j_user = os.getenv("NEO4J_USER", "neo4j")
-neo4j_pw = os.getenv("NEO4J_PASSWORD")
-
-#print(neo4j_pw, neo4j_uri, neo4j_user)
-
-driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_pw))
+# Allow both `python backend/graph_builder.py` and `import backend.graph_builder`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.schemas import ChampionNode
 
 LOGIC_RULES = {
     # IF target has [Key], THEN they are WEAK_TO [Value]
@@ -74,6 +70,8 @@ ARCHETYPE_RULES = {
 
 class GraphInserter:
     def __init__(self, uri, auth):
+        # Imported here: the rule tables above are read by serving code that never writes to Neo4j
+        from neo4j import GraphDatabase
         self.driver = GraphDatabase.driver(uri, auth=auth)
         
     def close(self):
@@ -175,11 +173,119 @@ class GraphInserter:
                         counter_mech=counter_mech, 
                         reason=rich_reason
                     )
-        
-with open('backend/processed_champions_v4.json', 'r') as f:
-    data = json.load(f)
+
+    def stamp_version(self, version):
+        """One :KnowledgeBase node carrying the seeded KB's version; serving processes key their answer tables on it."""
+        with self.driver.session() as session:
+            session.run("MERGE (k:KnowledgeBase) SET k.version = $version, k.seeded_at = datetime()", version=version).consume()
+
+    def bulk_load(self, champions, batch_size=50):
+        """Loads champions in batches, one managed write transaction per batch.
+        Produces the same graph as calling load_champion on every entry."""
+        total_champs = 0
+        total_edges = 0
+        start = time.perf_counter()
+
+        with self.driver.session() as session:
+            for i in range(0, len(champions), batch_size):
+                params = build_batch_params(champions[i:i + batch_size])
+                session.execute_write(_write_batch, params)
+
+                total_champs += len(params['champions'])
+                total_edges += count_batch_edges(params)
+                print(f"Imported batch {i // batch_size + 1} ({total_champs}/{len(champions)} champions)", flush=True)
+
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        stats = {
+            "champions": total_champs,
+            "edges": total_edges,
+            "seconds": round(elapsed, 3),
+            "champions_per_sec": round(total_champs / elapsed, 1),
+            "edges_per_sec": round(total_edges / elapsed, 1),
+        }
+        print(f"Bulk load: {stats['champions_per_sec']} champions/sec, {stats['edges_per_sec']} edges/sec ({stats['seconds']}s)")
+        return stats
+
+
+# --- BULK LOADING (UNWIND) ---
+# Each query mirrors one step of GraphInserter.load_champion, applied to a whole batch.
+BULK_CHAMPION_QUERY = """
+    UNWIND $champions AS row
+    MERGE (c:Champion {name: row.name})
+    SET c.archetype = row.archetype
+    MERGE (a:Archetype {name: row.archetype})
+    MERGE (c)-[:IS_A]->(a)
+    """
+
+BULK_ROLE_QUERY = """
+    UNWIND $roles AS row
+    MATCH (c:Champion {name: row.name})
+    MERGE (r:Role {name: row.role})
+    MERGE (c)-[:PLAYS_IN]->(r)
+    """
+
+BULK_MECHANIC_QUERY = """
+    UNWIND $mechanics AS row
+    MATCH (c:Champion {name: row.name})
+    MERGE (m:Mechanic {name: row.mech_name})
+    MERGE (c)-[r:HAS_MECHANIC]->(m)
+    SET r.description = row.details
+    """
+
+BULK_WEAKNESS_QUERY = """
+    UNWIND $weaknesses AS row
+    MATCH (c:Champion {name: row.name})
+    MERGE (m:Mechanic {name: row.counter_mech})
+    MERGE (c)-[:WEAK_TO {reason: row.reason}]->(m)
+    """
+
+def build_batch_params(champions):
+    """Flattens champion dicts into the parameter lists consumed by the UNWIND queries."""
+    params = {"champions": [], "roles": [], "mechanics": [], "weaknesses": []}
+
+    for champ in champions:
+        name = champ['name']
+        params['champions'].append({"name": name, "archetype": champ['archetype']})
+
+        for role in champ['primary_position']:
+            params['roles'].append({"name": name, "role": role})
+
+        for mech in champ['mechanics']:
+            params['mechanics'].append({"name": name, "mech_name": mech['name'], "details": mech['details']})
+
+        for mech in champ['mechanics']:
+            if mech['name'] in LOGIC_RULES:
+                counter_mech = LOGIC_RULES[mech['name']]
+                rich_reason = f"Vulnerable to {counter_mech} due to {mech['name']}: {mech.get('details', '')}"
+                params['weaknesses'].append({"name": name, "counter_mech": counter_mech, "reason": rich_reason})
+
+    return params
+
+def count_batch_edges(params):
+    # One IS_A edge per champion plus one edge per role / mechanic / weakness row
+    return len(params['champions']) + len(params['roles']) + len(params['mechanics']) + len(params['weaknesses'])
+
+def _write_batch(tx, params):
+    tx.run(BULK_CHAMPION_QUERY, champions=params['champions']).consume()
+    tx.run(BULK_ROLE_QUERY, roles=params['roles']).consume()
+    tx.run(BULK_MECHANIC_QUERY, mechanics=params['mechanics']).consume()
+    tx.run(BULK_WEAKNESS_QUERY, weaknesses=params['weaknesses']).consume()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the GraphLeague knowledge graph.")
+    parser.add_argument("--bulk", action="store_true", help="Load champions in batched UNWIND transactions")
+    parser.add_argument("--batch-size", type=int, default=50, help="Champions per write transaction in bulk mode")
+    parser.add_argument("--no-answer-table", action="store_true", help="Skip precomputing the answer table (replicas build it at startup)")
+    args = parser.parse_args()
+    # Checked before anything is written: constraints and layers go in ahead of the champions
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+
+    load_dotenv()
+    neo4j_uri = os.getenv("NEO4J_URI", "bolt://neo4j:7687")
+    neo4j_user = os.getenv("NEO4J_USER", "neo4j")
+    neo4j_pw = os.getenv("NEO4J_PASSWORD")
+
     loader = GraphInserter(neo4j_uri, (neo4j_user, neo4j_pw))
     
     try:
@@ -192,11 +298,33 @@ if __name__ == "__main__":
             
         print(f"Importing {len(champions)} champions...", flush=True)
         
-        for champ in champions:
-            loader.load_champion(champ)
-            print(f"Imported {champ['name']}")
+        if args.bulk:
+            loader.bulk_load(champions, batch_size=args.batch_size)
+        else:
+            for champ in champions:
+                loader.load_champion(champ)
+                print(f"Imported {champ['name']}")
             
         print("Import Complete!")
+
+        # Stamped last: replicas rebuild their answer tables only once the graph is complete
+        from backend.knowledge_base import kb_version
+        version = kb_version(champions, (LOGIC_RULES, ARCHETYPE_RULES))
+        loader.stamp_version(version)
+        print(f"KB version {version}")
+
+        # Precompute champion-vs-champion scores so counter-pick lookups skip the scoring query
+        from backend.matchup_matrix import build_matchup_artifact
+        build_matchup_artifact(champions)
+
+        # Compact KB the serving processes memory-map instead of parsing the JSON
+        from backend.kb_artifact import build_kb_artifact
+        build_kb_artifact(INPUT_FILE)
+
+        # Every champion/mechanic/archetype x lane answer, read back from the graph just seeded
+        if not args.no_answer_table:
+            from backend.answer_table import build_answer_table
+            build_answer_table()
         
     finally:
         loader.close()
\ No newline at end of file
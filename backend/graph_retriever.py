@@ -1,27 +1,22 @@
 import json
 import os
-from neo4j import GraphDatabase
-from dotenv import load_dotenv
-from google import genai
+import threading
 import time
-from google.genai.errors import ServerError
+from collections import deque
+from dotenv import load_dotenv
+from dataclasses import dataclass, field
+from typing import Any
 from backend import user_intent
+from backend.local_intent import LocalIntentParser
+from backend.name_resolver import NameResolver, suggestion_message
+from backend.cache import IntentCache
+from backend.event_loop import run_sync, maybe_await
+from backend.llm_gateway import LLMUnavailable, get_client, get_gateway, percentile
+from backend.tracing import get_tracer
 
 load_dotenv()
 
-class GraphRetriever:
-    def __init__(self):
-        load_dotenv()
-        neo4j_uri = os.getenv("NEO4J_URI")
-        neo4j_user = os.getenv("NEO4J_USER")
-        neo4j_pw = os.getenv("NEO4J_PASSWORD")
-        self.driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_pw))
-        
-    def close(self):
-        self.driver.close()
-        
-    def get_counter_picks(self, enemy_name, position=None, limit=2):
-        query = """
+COUNTER_PICKS_QUERY = """
                 MATCH (enemy:Champion {name: $enemyName})
                 MATCH (me:Champion)
                 
@@ -72,15 +67,43 @@ class GraphRetriever:
                 ORDER BY netScore DESC, offensiveScore DESC
                 LIMIT $limit
                 """
-        
-        with self.driver.session() as session:
-            params = {"enemyName": enemy_name, "myLane": position, "limit": limit}
-            result = session.run(query, parameters=params)
-            return [record.data() for record in result]
-    
-    def find_mechanic_holders(self, mechanic_name, position=None):
-        # Finds all champions who HAVE a specific mechanic.
-        query = """
+
+# Same scoring as COUNTER_PICKS_QUERY, run once per (enemy, lane) pair inside a single query.
+# The CALL subquery keeps ORDER BY/LIMIT per pair; `slot` maps rows back to the input list.
+COUNTER_PICKS_BATCH_QUERY = """
+                UNWIND $pairs AS pair
+                CALL {
+                    // Importing WITH rather than CALL (pair) scope, which needs Neo4j 5.23+
+                    WITH pair
+                    MATCH (enemy:Champion {name: pair.enemyName})
+                    MATCH (me:Champion)
+                    WHERE (pair.myLane IS NULL OR pair.myLane = "" OR EXISTS { (me)-[:PLAYS_IN]->(:Role {name: pair.myLane}) })
+
+                    OPTIONAL MATCH (enemy)-[:IS_A]->(:Archetype)<-[r1:COUNTERS]-(:Archetype)<-[:IS_A]-(me)
+                    OPTIONAL MATCH (enemy)-[w1:WEAK_TO]->(:Mechanic)<-[r2:HAS_MECHANIC]-(me)
+                    OPTIONAL MATCH (me)-[:IS_A]->(:Archetype)<-[r3:COUNTERS]-(:Archetype)<-[:IS_A]-(enemy)
+                    OPTIONAL MATCH (me)-[w2:WEAK_TO]->(:Mechanic)<-[r4:HAS_MECHANIC]-(enemy)
+
+                    WITH me,
+                        ((count(DISTINCT r1) * 1) + (count(DISTINCT r2) * 2)) AS offensiveScore,
+                        ((count(DISTINCT r3) * 1) + (count(DISTINCT r4) * 2)) AS defensiveScore,
+                        collect(DISTINCT r1.reason) + collect(DISTINCT w1.reason) AS pros,
+                        collect(DISTINCT r3.reason) + collect(DISTINCT w2.reason) AS cons
+                    WITH me, pros, cons, offensiveScore, defensiveScore,
+                        (offensiveScore - defensiveScore) AS netScore
+                    WHERE netScore > 0
+
+                    RETURN me.name AS Champion, netScore AS Score, offensiveScore AS Offense, defensiveScore AS Defense,
+                        [x IN pros WHERE x IS NOT NULL] AS Reasoning,
+                        [x IN cons WHERE x IS NOT NULL] AS Risks
+                    ORDER BY netScore DESC, offensiveScore DESC
+                    LIMIT $limit
+                }
+                RETURN pair.slot AS slot, Champion, Score, Offense, Defense, Reasoning, Risks
+                """
+
+# Finds all champions who HAVE a specific mechanic.
+MECHANIC_HOLDERS_QUERY = """
                 // FIX 1: Add 'r' inside the brackets to capture the relationship variable
                 MATCH (c:Champion)-[r:HAS_MECHANIC]->(m:Mechanic {name: $mechName})
                 
@@ -92,14 +115,9 @@ class GraphRetriever:
                 ORDER BY c.name ASC
                 LIMIT 5
                 """
-        with self.driver.session() as session:
-            params = {"mechName": mechanic_name, "myLane": position}
-            result = session.run(query, parameters=params)
-            return [record.data() for record in result]
 
-    def get_archetype_counters(self, target_archetype, position=None):
-        # Finds champions whose ARCHETYPE counters the TARGET ARCHETYPE, filtered by lane
-        query = """
+# Finds champions whose ARCHETYPE counters the TARGET ARCHETYPE, filtered by lane
+ARCHETYPE_COUNTERS_QUERY = """
                 MATCH (target:Archetype {name: $archName})<-[r:COUNTERS]-(counterClass:Archetype)
                 MATCH (c:Champion)-[:IS_A]->(counterClass)
                 
@@ -110,30 +128,350 @@ class GraphRetriever:
                 ORDER BY c.name ASC
                 LIMIT 5
                 """
-        with self.driver.session() as session:
-            # Pass the position parameter
-            params = {"archName": target_archetype, "myLane": position}
-            result = session.run(query, parameters=params)
-            return [record.data() for record in result]
+
+def neo4j_uri():
+    """NEO4J_URI; NEO4J_ROUTING=1 turns bolt:// into neo4j:// so reads are routed across a cluster."""
+    uri = os.getenv("NEO4J_URI")
+    if uri and uri.startswith("bolt") and os.getenv("NEO4J_ROUTING", "").lower() in ("1", "true", "yes"):
+        uri = "neo4j" + uri[len("bolt"):]
+    return uri
+
+def driver_config():
+    """Pool and retry settings for the read driver, from NEO4J_* environment variables."""
+    return {
+        "max_connection_pool_size": int(os.getenv("NEO4J_MAX_POOL_SIZE", "100")),
+        "connection_acquisition_timeout": float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "60")),
+        # Budget for execute_read's retries on transient errors and leader/replica switches
+        "max_transaction_retry_time": float(os.getenv("NEO4J_MAX_RETRY_SECONDS", "15")),
+    }
+
+def session_config():
+    config = {"fetch_size": int(os.getenv("NEO4J_FETCH_SIZE", "1000"))}
+    if os.getenv("NEO4J_DATABASE"):
+        # Naming the database saves a home-database lookup per new session
+        config["database"] = os.getenv("NEO4J_DATABASE")
+    return config
+
+# Stamped by graph_builder.py after every seed; the answer table is keyed on it
+KB_VERSION_QUERY = """
+                MATCH (k:KnowledgeBase)
+                RETURN k.version AS version
+                LIMIT 1
+                """
+
+class PoolMonitor:
+    """Sessions waiting for and holding a pooled connection, and how long acquisition took.
+
+    The driver doesn't expose its pool, so this counts from our side: a read waits from
+    opening its session until its transaction function first runs, then holds a connection.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.waiting = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.reads = 0
+        self.retries = 0
+        self._waits = deque(maxlen=1024)
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.waiting += 1
+
+    def acquired(self, wait):
+        with self._lock:
+            self.waiting -= 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self._waits.append(wait)
+        get_tracer().record("neo4j.acquire", wait)
+
+    def release(self, acquired, attempts):
+        with self._lock:
+            if acquired:
+                self.in_use -= 1
+            else:
+                self.waiting -= 1
+            self.reads += 1
+            self.retries += max(0, attempts - 1)
+
+    def gauges(self):
+        with self._lock:
+            return [
+                ("neo4j_pool_max_size", "Configured Neo4j connection pool size.", self.max_size),
+                ("neo4j_pool_in_use", "Reads holding a pooled Neo4j connection.", self.in_use),
+                ("neo4j_pool_waiting", "Reads waiting to acquire a Neo4j connection.", self.waiting),
+                ("neo4j_pool_utilization", "Share of the Neo4j pool held by reads.", round(self.in_use / self.max_size, 4)),
+                ("neo4j_pool_peak_in_use", "Most Neo4j connections held at once.", self.peak_in_use),
+            ]
+
+    def stats(self):
+        with self._lock:
+            waits = list(self._waits)
+            stats = {"max_size": self.max_size, "in_use": self.in_use, "waiting": self.waiting,
+                     "peak_in_use": self.peak_in_use, "reads": self.reads, "retries": self.retries}
+
+        def ms(value):
+            return round(value * 1000, 2) if value is not None else None
+
+        return {**stats, "acquire_p50_ms": ms(percentile(waits, 0.50)), "acquire_p99_ms": ms(percentile(waits, 0.99))}
+
+class AsyncGraphRetriever:
+    def __init__(self):
+        # neo4j is imported here so the memory backend and the API client never load it
+        from neo4j import AsyncGraphDatabase, READ_ACCESS
+
+        load_dotenv()
+        neo4j_user = os.getenv("NEO4J_USER")
+        neo4j_pw = os.getenv("NEO4J_PASSWORD")
+        config = driver_config()
+        self.driver = AsyncGraphDatabase.driver(neo4j_uri(), auth=(neo4j_user, neo4j_pw), **config)
+        # Every query is a read: with neo4j:// the driver sends them to followers and read replicas
+        self.session_config = {**session_config(), "default_access_mode": READ_ACCESS}
+        self.pool = PoolMonitor(config["max_connection_pool_size"])
+        get_tracer().register_gauges("neo4j_pool", self.pool.gauges)
+        self._draft_engine = None
+
+    async def close(self):
+        await self.driver.close()
+
+    async def warm(self):
+        # The driver connects lazily; this opens the first pooled connection ahead of traffic
+        await self.driver.verify_connectivity()
+
+    async def _read(self, name, query, params, **attrs):
+        """Runs one query in a managed read transaction, retried by the driver on transient errors."""
+        with get_tracer().span(f"neo4j.{name}", **(attrs or params)) as span:
+            attempts, acquired = 0, False
+            self.pool.enter()
+            opened = time.perf_counter()
+
+            async def work(tx):
+                nonlocal attempts, acquired
+                attempts += 1
+                if not acquired:
+                    acquired = True
+                    span.set(acquire_ms=round((time.perf_counter() - opened) * 1000, 2))
+                    self.pool.acquired(time.perf_counter() - opened)
+                result = await tx.run(query, parameters=params)
+                records = [record.data() async for record in result]
+                return records, await result.consume()
+
+            try:
+                async with self.driver.session(**self.session_config) as session:
+                    records, summary = await session.execute_read(work)
+            finally:
+                self.pool.release(acquired, attempts)
+            span.set(
+                rows=len(records),
+                attempts=attempts,
+                result_available_after_ms=summary.result_available_after,
+                result_consumed_after_ms=summary.result_consumed_after,
+            )
+            return records
+
+    def stats(self):
+        return {"uri_scheme": neo4j_uri().split("://")[0], "pool": self.pool.stats()}
+
+    async def kb_version(self):
+        """Version of the seeded KB, or None for a graph seeded before versioning."""
+        records = await self._read("kb_version", KB_VERSION_QUERY, {})
+        return records[0]["version"] if records else None
+
+    async def get_counter_picks(self, enemy_name, position=None, limit=2):
+        params = {"enemyName": enemy_name, "myLane": position, "limit": limit}
+        return await self._read("get_counter_picks", COUNTER_PICKS_QUERY, params)
+
+    async def get_counter_picks_batch(self, pairs, limit=2):
+        """Counter picks for several (enemy, lane) pairs in one query and one read transaction."""
+        pairs = [(enemy, position) for enemy, position in pairs]
+        params = {
+            "pairs": [{"slot": i, "enemyName": enemy, "myLane": position} for i, (enemy, position) in enumerate(pairs)],
+            "limit": limit,
+        }
+
+        records = await self._read("get_counter_picks_batch", COUNTER_PICKS_BATCH_QUERY, params, pairs=len(pairs), limit=limit)
+        grouped = [[] for _ in pairs]
+        for record in records:
+            grouped[record.pop("slot")].append(record)
+        return batch_result(pairs, grouped)
+
+    async def find_mechanic_holders(self, mechanic_name, position=None):
+        params = {"mechName": mechanic_name, "myLane": position}
+        return await self._read("find_mechanic_holders", MECHANIC_HOLDERS_QUERY, params)
+
+    async def get_archetype_counters(self, target_archetype, position=None):
+        params = {"archName": target_archetype, "myLane": position}
+        return await self._read("get_archetype_counters", ARCHETYPE_COUNTERS_QUERY, params)
+
+    async def get_draft_picks(self, enemy_names, open_roles=None, excluded=None, limit=3, joint=False):
+        # Team drafts score against the precomputed matchup matrix rather than the graph
+        if self._draft_engine is None:
+            from backend.memory_retriever import InMemoryGraphRetriever
+            self._draft_engine = InMemoryGraphRetriever()
+        return self._draft_engine.get_draft_picks(enemy_names, open_roles, excluded, limit, joint)
+
+class GraphRetriever:
+    """Blocking facade over AsyncGraphRetriever; queries run on the shared event loop."""
+    def __init__(self):
+        # Build the async driver on the loop it will be used from
+        self.aio = run_sync(_build_async_retriever())
+        
+    def close(self):
+        run_sync(self.aio.close())
+
+    def stats(self):
+        return self.aio.stats()
+        
+    def get_counter_picks(self, enemy_name, position=None, limit=2):
+        return run_sync(self.aio.get_counter_picks(enemy_name, position, limit))
+    
+    def get_counter_picks_batch(self, pairs, limit=2):
+        return run_sync(self.aio.get_counter_picks_batch(pairs, limit))
+
+    def find_mechanic_holders(self, mechanic_name, position=None):
+        return run_sync(self.aio.find_mechanic_holders(mechanic_name, position))
+
+    def get_archetype_counters(self, target_archetype, position=None):
+        return run_sync(self.aio.get_archetype_counters(target_archetype, position))
+
+    def get_draft_picks(self, enemy_names, open_roles=None, excluded=None, limit=3, joint=False):
+        return run_sync(self.aio.get_draft_picks(enemy_names, open_roles, excluded, limit, joint))
+
+    def kb_version(self):
+        return run_sync(self.aio.kb_version())
+
+def batch_result(pairs, grouped):
+    """Shapes per-pair counter picks into {"per_enemy": [...], "aggregate": [...]}.
+
+    The aggregate ranks every returned champion by how many of the enemies it counters,
+    then by its summed net score, so one pick that answers several threats comes first.
+    """
+    per_enemy = []
+    totals = {}
+    for (enemy, position), picks in zip(pairs, grouped):
+        per_enemy.append({"Enemy": enemy, "Position": position, "Picks": picks})
+        for pick in picks:
+            entry = totals.setdefault(pick["Champion"], {"Champion": pick["Champion"], "Score": 0, "Counters": []})
+            entry["Score"] += pick["Score"]
+            if enemy not in entry["Counters"]:
+                entry["Counters"].append(enemy)
+
+    aggregate = sorted(totals.values(), key=lambda row: (-len(row["Counters"]), -row["Score"], row["Champion"]))
+    return {"per_enemy": per_enemy, "aggregate": aggregate}
+
+async def _build_async_retriever():
+    from backend.answer_table import with_answer_table
+    return with_answer_table(AsyncGraphRetriever())
+
+def build_graph_retriever(backend=None):
+    """Returns the retriever selected by GRAPH_BACKEND: 'neo4j' (default) or 'memory'."""
+    backend = (backend or os.getenv("GRAPH_BACKEND", "neo4j")).lower()
+    if backend == "memory":
+        # Serves from the KB file in-process, so Neo4j is not needed at query time
+        from backend.memory_retriever import InMemoryGraphRetriever
+        return InMemoryGraphRetriever()
+    return GraphRetriever()
+
+def build_async_graph_retriever(backend=None):
+    """Async counterpart of build_graph_retriever, for callers that own their event loop."""
+    backend = (backend or os.getenv("GRAPH_BACKEND", "neo4j")).lower()
+    if backend == "memory":
+        from backend.memory_retriever import InMemoryGraphRetriever
+        return InMemoryGraphRetriever()
+    from backend.answer_table import with_answer_table
+    return with_answer_table(AsyncGraphRetriever())
         
+@dataclass
+class RoutedQuery:
+    # Everything the caller needs after routing: the intent, the graph rows and a short context line
+    intent: Any
+    graph_data: Any
+    context: str
+    # Stage durations in ms: classify, graph
+    timings: dict = field(default_factory=dict)
+    # Pass to the Responder so the answer's spans land in the same trace
+    trace_id: str = None
+    # Champion mentions that didn't resolve: {raw: [suggested names]}; answer with these instead of the LLM
+    suggestions: dict = field(default_factory=dict)
+
+    @property
+    def suggestion_text(self):
+        return suggestion_message(self.suggestions) if self.suggestions else None
+
 class Switchboard:
-    def __init__(self):
-        self.model = genai.Client()
+    def __init__(self, use_local_parser=True, use_cache=True):
+        # Deadline, backoff, circuit breaker and concurrency limit shared with the Responder
+        self.gateway = get_gateway()
+        # Resolves simple queries from the KB lexicon so they skip the Gemini call
+        self.local_parser = None
+        # Canonicalizes champion names (nicknames, typos) before they reach the graph
+        self.name_resolver = None
+        try:
+            self.name_resolver = NameResolver()
+            if use_local_parser:
+                self.local_parser = LocalIntentParser()
+        except (OSError, ValueError) as e:
+            # No KB on disk: every query goes to Gemini and names pass through as written
+            print(f"⚠️ Local intent parser and name resolver disabled, champion names unavailable: {e}")
+        # Repeated questions (e.g. the sidebar quick prompts) are answered from the intent cache
+        self.intent_cache = IntentCache(self.local_parser) if use_cache else None
         self.system_prompt = """
         You are the Intent Classifier for a League of Legends strategy tool.
         Analyze the user's query and route it to the correct intent object.
         - Always give Champion names in Proper Casing. Example: Irelia, Poppy, Ashe
         - Map synonyms for mechanics (e.g. "Anti-Heal" -> "Grievous Wounds").
         - Map synonyms for lanes (e.g. "ADC" -> "Bot").
+        - If the user lists several enemy champions (a draft / enemy team), choose TeamDraft.
         - If the query is about skins, lore, or stats, choose UnknownIntent.
         """
     
+    @property
+    def model(self):
+        # Shared Gemini client, built on the first LLM call (queries the local parser answers never need it)
+        return get_client()
+
     def classify_intent(self, user_query: str):
-        max_retries = 10
-        base_delay = 1
-        for attempt in range(max_retries):
-            try:
-                response = self.model.models.generate_content(
+        return run_sync(self.aclassify_intent(user_query))
+
+    async def aclassify_intent(self, user_query: str):
+        with get_tracer().span("classify") as span:
+            intent, source = await self._classify(user_query)
+            span.set(source=source, intent=getattr(intent, "intent_type", None))
+            return intent
+
+    async def aclassify_local(self, user_query: str):
+        """The intent from the cache or the local parser, or None when only Gemini could classify it."""
+        with get_tracer().span("classify") as span:
+            intent, source = None, "none"
+            if self.intent_cache is not None:
+                intent, source = self.intent_cache.get(user_query), "cache"
+            if intent is None and self.local_parser is not None:
+                intent, source = self.local_parser.parse(user_query), "local"
+            span.set(source=source if intent is not None else "none", intent=getattr(intent, "intent_type", None))
+            return intent
+
+    async def _classify(self, user_query: str):
+        if self.intent_cache is not None:
+            intent = self.intent_cache.get(user_query)
+            if intent is not None:
+                return intent, "cache"
+
+        intent, source = await self._classify_uncached(user_query)
+        if intent is not None and self.intent_cache is not None:
+            self.intent_cache.set(user_query, intent)
+        return intent, source
+
+    async def _classify_uncached(self, user_query: str):
+        if self.local_parser is not None:
+            intent = self.local_parser.parse(user_query)
+            if intent is not None:
+                return intent, "local"
+
+        try:
+            response = await self.gateway.acall(
+                lambda: self.model.aio.models.generate_content(
                     model="gemini-2.5-flash",
                     contents=f"{self.system_prompt}\n\nUser Query: {user_query}",
                     config={
@@ -141,65 +479,143 @@ class Switchboard:
                     "response_schema": user_intent.Router, 
                     "temperature": 0.3,
                     }
-                )
-                json_data = json.loads(response.text)
-                return user_intent.Router(**json_data).choice
-            
-            except ServerError as e:
-                #print(f"Server overloaded (Attempt {attempt + 1}/{max_retries})...")
-                
-                sleep_time = base_delay * (2 ** attempt) 
-                #print(f"Retrying in {sleep_time} seconds...")
-                time.sleep(sleep_time)
-                    
-            except Exception as e:
-                print(f"Critical API Error: {e}")
-                break
+                ),
+                name="classify",
+            )
+            json_data = json.loads(response.text)
+            return user_intent.Router(**json_data).choice, "llm"
+
+        except LLMUnavailable as e:
+            print(f"Intent classification unavailable: {e}")
+        except Exception as e:
+            print(f"Critical API Error: {e}")
+        return None, "llm"
+
+    def resolve_names(self, intent):
+        """Returns (intent with canonical champion names, {raw: suggestions} for names that didn't resolve)."""
+        suggestions = {}
+        if self.name_resolver is None:
+            return intent, suggestions
+
+        def canonical(raw):
+            resolution = self.name_resolver.resolve(raw)
+            if resolution.name is None:
+                suggestions[raw] = resolution.suggestions
+            return resolution.name
 
-    def handle_query(self, user_query, graph_retriever):
-        intent = self.classify_intent(user_query)
-        context_str = ""
         match intent:
             case user_intent.CounterPick():
-                print(f"Intent: Counter Pick vs {intent.enemy_champion} ({intent.my_position or 'Any Lane'})")
-                context_str = f"Countering {intent.enemy_champion} in {intent.my_position or 'Any Lane'}"
-
-                graph_data = graph_retriever.get_counter_picks(
-                    enemy_name=intent.enemy_champion, 
-                    position=intent.my_position, 
-                    limit=3
-                )
-            # Case 2: Who has Anti Heal?
-            case user_intent.MechanicSearch():
-                print(f"🔍 Intent: Mechanic Search for {intent.mechanic_concept} ({intent.my_position or 'Any Lane'})")
-                context_str = f"Champions with {intent.mechanic_concept} in {intent.my_position or 'Any Lane'}"
+                name = canonical(intent.enemy_champion)
+                if name is not None:
+                    intent = intent.model_copy(update={"enemy_champion": name})
+            case user_intent.TeamDraft():
+                enemies = [canonical(raw) for raw in intent.enemy_champions]
+                # Picks/bans only narrow the pool, so unknown ones are dropped rather than reported
+                unavailable = [r.name for r in map(self.name_resolver.resolve, intent.unavailable_champions) if r.name]
+                if not suggestions:
+                    intent = intent.model_copy(update={"enemy_champions": enemies, "unavailable_champions": unavailable})
+        return intent, suggestions
+
+    def handle_query(self, user_query, graph_retriever):
+        routed = self.route(user_query, graph_retriever)
+        return routed.graph_data, routed.context
+
+    async def ahandle_query(self, user_query, graph_retriever):
+        routed = await self.aroute(user_query, graph_retriever)
+        return routed.graph_data, routed.context
+
+    def route(self, user_query, graph_retriever, trace_id=None, intent=None):
+        return run_sync(self.aroute(user_query, graph_retriever, trace_id, intent))
+
+    async def aroute(self, user_query, graph_retriever, trace_id=None, intent=None):
+        # One trace per query; the caller can pass its own id to fold in spans recorded around routing.
+        # A caller that already classified the query passes the intent to skip classification
+        with get_tracer().span("route", trace_id=trace_id) as span:
+            routed = await self._route(user_query, graph_retriever, intent)
+            routed.trace_id = span.trace_id
+            span.set(intent=getattr(routed.intent, "intent_type", None))
+        return routed
+
+    async def _route(self, user_query, graph_retriever, intent=None):
+        # Sync GraphRetrievers expose their async core; the in-memory backend is called directly
+        graph_retriever = getattr(graph_retriever, "aio", graph_retriever)
+
+        started = time.perf_counter()
+        if intent is None:
+            intent = await self.aclassify_intent(user_query)
+        classified = time.perf_counter()
+        timings = {"classify_ms": round((classified - started) * 1000, 2)}
+        context_str = ""
+        with get_tracer().span("resolve") as span:
+            intent, suggestions = self.resolve_names(intent)
+            span.set(unresolved=len(suggestions))
+        if suggestions:
+            print(f"⚠️ Unresolved champion names: {suggestions}")
+            timings["graph_ms"] = 0.0
+            return RoutedQuery(intent, [], "Unknown champion", timings, suggestions=suggestions)
+
+        with get_tracer().span("graph", intent=getattr(intent, "intent_type", None)) as span:
+            match intent:
+                case user_intent.CounterPick():
+                    print(f"Intent: Counter Pick vs {intent.enemy_champion} ({intent.my_position or 'Any Lane'})")
+                    context_str = f"Countering {intent.enemy_champion} in {intent.my_position or 'Any Lane'}"
+
+                    graph_data = await maybe_await(graph_retriever.get_counter_picks(
+                        enemy_name=intent.enemy_champion, 
+                        position=intent.my_position, 
+                        limit=3
+                    ))
+                # Case 2: Who has Anti Heal?
+                case user_intent.MechanicSearch():
+                    print(f"🔍 Intent: Mechanic Search for {intent.mechanic_concept} ({intent.my_position or 'Any Lane'})")
+                    context_str = f"Champions with {intent.mechanic_concept} in {intent.my_position or 'Any Lane'}"
                 
-                graph_data = graph_retriever.find_mechanic_holders(
-                    mechanic_name=intent.mechanic_concept,
-                    position=intent.my_position
-                )
-
-            # Case 3: "Who to counter Burst?"
-            case user_intent.ArchetypeCounters():
-                print(f"🔍 Intent: Archetype Strategy vs {intent.enemy_archetype} ({intent.my_position or 'Any Lane'})")
-                context_str = f"Champions that counter {intent.enemy_archetype}s in {intent.my_position or 'Any Lane'}"
+                    graph_data = await maybe_await(graph_retriever.find_mechanic_holders(
+                        mechanic_name=intent.mechanic_concept,
+                        position=intent.my_position
+                    ))
+
+                # Case 3: "Who to counter Burst?"
+                case user_intent.ArchetypeCounters():
+                    print(f"🔍 Intent: Archetype Strategy vs {intent.enemy_archetype} ({intent.my_position or 'Any Lane'})")
+                    context_str = f"Champions that counter {intent.enemy_archetype}s in {intent.my_position or 'Any Lane'}"
                 
-                graph_data = graph_retriever.get_archetype_counters(
-                    target_archetype=intent.enemy_archetype,
-                    position=intent.my_position
-                )
-
-            # Case 4: Nonsense / Off-topic
-            case user_intent.UnknownIntent():
-                print(f"⚠️ Unknown Intent: {intent.reason}")
-                return "NA", "NA"
+                    graph_data = await maybe_await(graph_retriever.get_archetype_counters(
+                        target_archetype=intent.enemy_archetype,
+                        position=intent.my_position
+                    ))
+
+                # Case 4: "Enemy has Zed, Lee Sin and Ashe, what do we pick?"
+                case user_intent.TeamDraft():
+                    roles = ', '.join(intent.open_roles) or 'all roles'
+                    print(f"🔍 Intent: Team Draft vs {', '.join(intent.enemy_champions)} ({roles})")
+                    context_str = f"Drafting against {', '.join(intent.enemy_champions)} for {roles}"
+                    if intent.joint:
+                        context_str += " (one pick per role)"
+
+                    graph_data = await maybe_await(graph_retriever.get_draft_picks(
+                        enemy_names=intent.enemy_champions,
+                        open_roles=intent.open_roles,
+                        excluded=intent.unavailable_champions,
+                        limit=2,
+                        joint=intent.joint
+                    ))
+
+                # Case 5: Nonsense / Off-topic
+                case user_intent.UnknownIntent():
+                    print(f"⚠️ Unknown Intent: {intent.reason}")
+                    return RoutedQuery(intent, "NA", "NA", timings)
             
-            # Fallback for safety
-            case _:
-                print("⚠️ Error: Unrecognized intent type")
-                return "NA", "NA"
+                # Fallback for safety
+                case _:
+                    print("⚠️ Error: Unrecognized intent type")
+                    return RoutedQuery(intent, "NA", "NA", timings)
+
+            if isinstance(graph_data, list):
+                span.set(results=len(graph_data))
 
-        return graph_data, context_str
+        timings["graph_ms"] = round((time.perf_counter() - classified) * 1000, 2)
+        return RoutedQuery(intent, graph_data, context_str, timings)
     
 # test = GraphRetriever()
 # #print(test.get_archetype_counters("Diver", position='Mid'))
@@ -0,0 +1,288 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from collections.abc import Sequence
+from typing import get_args
+import numpy as np
+
+# Allow `python backend/kb_artifact.py` as well as `python -m backend.kb_artifact`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.knowledge_base import KB_FILE, kb_version
+from backend.schemas import StrategicMechanic, ValidArchetype, ValidPosition
+
+MAGIC = b"GLKB"
+FORMAT_VERSION = 1
+
+# magic, format version, section count, champion count, content hash, source file digest, rules digest
+HEADER = struct.Struct("<4sHHI16s16s16s")
+# section name, numpy dtype, byte offset, item count
+SECTION = struct.Struct("<16s4sQQ")
+
+def artifact_path(source=None):
+    """KB_ARTIFACT_PATH, else the source JSON path with a .kb extension."""
+    source = source or os.getenv("KB_PATH", KB_FILE)
+    return os.getenv("KB_ARTIFACT_PATH", os.path.splitext(source)[0] + '.kb')
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+def rules_digest(rules):
+    return kb_version([], rules)
+
+class Vocabulary:
+    """Interns strings to dense integer ids, seeded with the schema's literal values."""
+    def __init__(self, seed=()):
+        self.values = []
+        self.ids = {}
+        for value in seed:
+            self.id(value)
+
+    def id(self, value):
+        if value not in self.ids:
+            self.ids[value] = len(self.values)
+            self.values.append(value)
+        return self.ids[value]
+
+def compile_tables(champions):
+    """Flattens the champion list into interned string tables and CSR-style integer arrays."""
+    archetypes = Vocabulary(get_args(ValidArchetype))
+    roles = Vocabulary(get_args(ValidPosition))
+    mechanics = Vocabulary(get_args(StrategicMechanic))
+    details = Vocabulary()
+
+    # Per-champion lists (roles, mechanics) are one flat id array plus offsets, in source order
+    archetype_ids = np.zeros(len(champions), dtype='<u2')
+    role_offsets = np.zeros(len(champions) + 1, dtype='<u4')
+    mech_offsets = np.zeros(len(champions) + 1, dtype='<u4')
+    role_ids, mech_ids, detail_ids = [], [], []
+
+    for i, champ in enumerate(champions):
+        archetype_ids[i] = archetypes.id(champ['archetype'])
+        for role in champ['primary_position']:
+            role_ids.append(roles.id(role))
+        role_offsets[i + 1] = len(role_ids)
+        for mech in champ['mechanics']:
+            mech_ids.append(mechanics.id(mech['name']))
+            detail_ids.append(details.id(mech['details']))
+        mech_offsets[i + 1] = len(mech_ids)
+
+    tables = {
+        "archetype": archetype_ids,
+        "role_offsets": role_offsets,
+        "role_ids": np.asarray(role_ids, dtype='<u2'),
+        "mech_offsets": mech_offsets,
+        "mech_ids": np.asarray(mech_ids, dtype='<u2'),
+        "detail_ids": np.asarray(detail_ids, dtype='<u4'),
+    }
+    strings = {
+        "names": [champ['name'] for champ in champions],
+        "archetypes": archetypes.values,
+        "roles_vocab": roles.values,
+        "mechanics": mechanics.values,
+        "details": details.values,
+    }
+    return tables, strings
+
+def _string_sections(name, values):
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype='<u4')
+    offsets[1:] = np.cumsum([len(value) for value in encoded], dtype=np.int64)
+    return {f"{name}.off": offsets, f"{name}.txt": np.frombuffer(b"".join(encoded), dtype='u1')}
+
+def write_artifact(champions, path, source_digest="", rules=()):
+    tables, strings = compile_tables(champions)
+    sections = dict(tables)
+    for name, values in strings.items():
+        sections.update(_string_sections(name, values))
+
+    # Sections start on 8-byte boundaries so every array view is aligned
+    offset = HEADER.size + SECTION.size * len(sections)
+    directory, payload = [], []
+    for name, array in sections.items():
+        offset += -offset % 8
+        directory.append(SECTION.pack(name.encode('ascii'), array.dtype.str.encode('ascii'), offset, len(array)))
+        payload.append((offset, array.tobytes()))
+        offset += array.nbytes
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, len(sections), len(champions),
+        kb_version(champions, rules).encode('ascii'), source_digest.encode('ascii'), rules_digest(rules).encode('ascii'),
+    )
+    # Workers compiling at the same time each write their own temp file in the same directory
+    with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(os.path.abspath(path)), prefix=os.path.basename(path) + '.', suffix='.tmp', delete=False) as f:
+        tmp_path = f.name
+        try:
+            f.write(header)
+            f.write(b"".join(directory))
+            for start, data in payload:
+                f.write(b"\0" * (start - f.tell()))
+                f.write(data)
+        except BaseException:
+            f.close()
+            os.remove(tmp_path)
+            raise
+    # NamedTemporaryFile creates 0600; keep the artifact readable like a plain open() would
+    os.chmod(tmp_path, 0o644)
+    # Readers mapping the old file keep their pages; new readers see the whole new file
+    os.replace(tmp_path, path)
+
+class StringTable(Sequence):
+    """Read-only view of an offsets + UTF-8 blob pair; strings are decoded on access."""
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8')
+
+    def to_list(self):
+        # One copy of the blob and plain-int offsets beat per-item numpy slicing
+        data = self.blob.tobytes()
+        offsets = self.offsets.tolist()
+        return [data[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+
+class CompiledKB(Sequence):
+    """A memory-mapped knowledge-base artifact.
+
+    Every table is a numpy view straight into the mapping, so opening the file costs a
+    header parse and worker processes share the pages. Indexing yields champion dicts in
+    the processed_champions_v4.json shape.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, fmt, section_count, count, version, source_digest, rules = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a knowledge-base artifact")
+        if fmt != FORMAT_VERSION:
+            raise ValueError(f"{path} has format {fmt}, expected {FORMAT_VERSION}")
+        self.count = count
+        self.version = version.decode('ascii')
+        self.source_digest = source_digest.decode('ascii')
+        self.rules_digest = rules.decode('ascii')
+
+        self._arrays = {}
+        for i in range(section_count):
+            name, dtype, offset, length = SECTION.unpack_from(self._mmap, HEADER.size + i * SECTION.size)
+            self._arrays[name.rstrip(b"\0").decode('ascii')] = np.frombuffer(
+                self._mmap, dtype=np.dtype(dtype.rstrip(b"\0").decode('ascii')), count=length, offset=offset
+            )
+
+        self.archetype_ids = self._arrays["archetype"]
+        self.role_offsets = self._arrays["role_offsets"]
+        self.role_ids = self._arrays["role_ids"]
+        self.mech_offsets = self._arrays["mech_offsets"]
+        self.mech_ids = self._arrays["mech_ids"]
+        self.detail_ids = self._arrays["detail_ids"]
+        self.names = self._strings("names")
+        self.details = self._strings("details")
+        # The vocabularies are a few dozen short strings; decode them once
+        self.archetypes = list(self._strings("archetypes"))
+        self.roles = list(self._strings("roles_vocab"))
+        self.mechanics = list(self._strings("mechanics"))
+
+    def _strings(self, name):
+        return StringTable(self._arrays[f"{name}.off"], self._arrays[f"{name}.txt"])
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        start, end = int(self.mech_offsets[i]), int(self.mech_offsets[i + 1])
+        return {
+            "name": self.names[i],
+            "archetype": self.archetypes[self.archetype_ids[i]],
+            "primary_position": [self.roles[r] for r in self.role_ids[self.role_offsets[i]:self.role_offsets[i + 1]]],
+            "mechanics": [
+                {"name": self.mechanics[self.mech_ids[j]], "details": self.details[self.detail_ids[j]]}
+                for j in range(start, end)
+            ],
+        }
+
+    def to_champions(self):
+        """The whole KB as champion dicts; repeated strings (roles, mechanics, details) are shared objects."""
+        names = self.names.to_list()
+        details = self.details.to_list()
+        archetype_ids = self.archetype_ids.tolist()
+        role_offsets, role_ids = self.role_offsets.tolist(), self.role_ids.tolist()
+        mech_offsets, mech_ids, detail_ids = self.mech_offsets.tolist(), self.mech_ids.tolist(), self.detail_ids.tolist()
+        return [
+            {
+                "name": names[i],
+                "archetype": self.archetypes[archetype_ids[i]],
+                "primary_position": [self.roles[r] for r in role_ids[role_offsets[i]:role_offsets[i + 1]]],
+                "mechanics": [
+                    {"name": self.mechanics[mech_ids[j]], "details": details[detail_ids[j]]}
+                    for j in range(mech_offsets[i], mech_offsets[i + 1])
+                ],
+            }
+            for i in range(self.count)
+        ]
+
+    def is_fresh(self, source=None):
+        """True when the artifact was compiled from the source JSON as it is now (or the JSON isn't shipped)."""
+        source = source or os.getenv("KB_PATH", KB_FILE)
+        return not os.path.exists(source) or file_digest(source) == self.source_digest
+
+def load_artifact(source=None, path=None):
+    """The compiled KB for `source` when it exists and is fresh, else None (callers fall back to the JSON)."""
+    path = path or artifact_path(source)
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        kb = CompiledKB(path)
+    except (ValueError, struct.error) as e:
+        print(f"⚠️ Ignoring KB artifact {path}: {e}")
+        return None
+    return kb if kb.is_fresh(source) else None
+
+def build_kb_artifact(source=None, path=None):
+    """Validates the processed champion JSON once and compiles it next to the source."""
+    from backend.graph_builder import LOGIC_RULES, ARCHETYPE_RULES
+    from backend.schemas import ChampionNode
+
+    source = source or os.getenv("KB_PATH", KB_FILE)
+    path = path or artifact_path(source)
+    start = time.perf_counter()
+    with open(source, 'rb') as f:
+        raw = f.read()
+    champions = json.loads(raw)
+    for champ in champions:
+        ChampionNode(**champ)
+
+    write_artifact(champions, path, hashlib.sha256(raw).hexdigest()[:16], (LOGIC_RULES, ARCHETYPE_RULES))
+    print(f"KB artifact ({len(champions)} champions, {os.path.getsize(path)} bytes, "
+          f"JSON {len(raw)} bytes) written to {path} in {(time.perf_counter() - start) * 1000:.1f}ms")
+    return CompiledKB(path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile processed_champions_v4.json into a memory-mappable KB artifact.")
+    parser.add_argument("--source", help="Processed champion JSON (default: KB_PATH or backend/processed_champions_v4.json)")
+    parser.add_argument("--output", help="Artifact path (default: KB_ARTIFACT_PATH or the source with a .kb extension)")
+    args = parser.parse_args()
+
+    build_kb_artifact(args.source, args.output)
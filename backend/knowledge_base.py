@@ -0,0 +1,45 @@
+import hashlib
+import json
+import os
+
+# The processed champion list produced by processing.py and consumed by graph_builder.py
+KB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'processed_champions_v4.json')
+
+def load_champions(path=None):
+    """Reads the processed champion list. KB_PATH overrides the default location.
+
+    Prefers the compiled artifact (backend/kb_artifact.py) when it matches the JSON on disk.
+    """
+    from backend.kb_artifact import load_artifact
+
+    path = path or os.getenv("KB_PATH", KB_FILE)
+    kb = load_artifact(path)
+    if kb is not None:
+        return kb.to_champions()
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_champion_names(path=None):
+    """Just the champion names, read from the artifact's string table without building any dicts."""
+    from backend.kb_artifact import load_artifact
+
+    kb = load_artifact(path or os.getenv("KB_PATH", KB_FILE))
+    if kb is not None:
+        return kb.names.to_list()
+    return [champ['name'] for champ in load_champions(path)]
+
+def kb_version(champions, rules=()):
+    """Short content hash of the champion list and rule tables; changes whenever the seeded graph would."""
+    payload = json.dumps([champions, *rules], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def current_kb_version():
+    """Version of the KB file plus the graph_builder rule tables currently on disk."""
+    from backend.graph_builder import LOGIC_RULES, ARCHETYPE_RULES
+    from backend.kb_artifact import load_artifact, rules_digest
+
+    rules = (LOGIC_RULES, ARCHETYPE_RULES)
+    kb = load_artifact()
+    if kb is not None and kb.rules_digest == rules_digest(rules):
+        return kb.version
+    return kb_version(load_champions(), rules)
@@ -0,0 +1,296 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from backend.tracing import get_tracer
+
+class LLMUnavailable(Exception):
+    """Gemini could not be reached within the request's budget."""
+
+class CircuitOpenError(LLMUnavailable):
+    pass
+
+class DeadlineExceeded(LLMUnavailable):
+    pass
+
+def is_retryable(exc):
+    # 5xx/overload and 429 rate limits are worth retrying; other client errors are not.
+    # Only reached after a call failed, so google.genai is already loaded by then
+    from google.genai.errors import ClientError, ServerError
+    if isinstance(exc, ServerError):
+        return True
+    if isinstance(exc, ClientError) and getattr(exc, "code", None) == 429:
+        return True
+    return isinstance(exc, (asyncio.TimeoutError, TimeoutError))
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class CircuitBreaker:
+    """closed -> open after `failure_threshold` consecutive failures; after `reset_timeout`
+    one half-open probe is let through and its outcome closes or re-opens the circuit."""
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Frees the half-open slot when the probe was cancelled before it had an outcome."""
+        with self._lock:
+            if self.state == "half_open":
+                self._probe_in_flight = False
+
+class LLMGateway:
+    """Single path to Gemini for the classifier, the responder and the preprocessing job.
+
+    Every call gets a deadline, capped full-jitter backoff between retries, a shared
+    circuit breaker and a concurrency limit. call() is for threads, acall() for coroutines.
+    """
+    def __init__(self, max_concurrency=8, deadline=30.0, max_attempts=6, base_delay=0.5, max_delay=8.0,
+                 failure_threshold=5, reset_timeout=30.0):
+        self.max_concurrency = max_concurrency
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self._thread_slots = threading.BoundedSemaphore(max_concurrency)
+        self._loop_slots = {}  # event loop -> asyncio.Semaphore
+        self._lock = threading.Lock()
+        self.metrics = {"calls": 0, "successes": 0, "failures": 0, "retries": 0, "short_circuited": 0, "deadline_exceeded": 0, "in_flight": 0}
+        self._latencies = deque(maxlen=1024)
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _count(self, key, delta=1):
+        with self._lock:
+            self.metrics[key] += delta
+
+    def _check_breaker(self, name):
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpenError(f"{name}: circuit open, Gemini marked unhealthy")
+
+    def _next_delay(self, name, attempt, deadline_at):
+        if attempt + 1 >= self.max_attempts:
+            return None
+        delay = self._backoff(attempt)
+        if time.monotonic() + delay >= deadline_at:
+            self._count("deadline_exceeded")
+            raise DeadlineExceeded(f"{name}: deadline reached after {attempt + 1} attempt(s)")
+        self._count("retries")
+        return delay
+
+    def _finish(self, started, ok):
+        with self._lock:
+            self.metrics["in_flight"] -= 1
+            self.metrics["successes" if ok else "failures"] += 1
+            if ok:
+                self._latencies.append(time.monotonic() - started)
+
+    def call(self, fn, deadline=None, name="llm"):
+        """Runs fn() in the calling thread. The deadline bounds the wait for a slot and the
+        retries, but a thread can't be interrupted: a single fn() that hangs runs past it,
+        so fn should carry its own request timeout."""
+        with get_tracer().span(f"llm.{name}") as span:
+            return self._call(fn, deadline, name, span)
+
+    def _call(self, fn, deadline, name, span):
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        started = time.monotonic()
+        self._count("calls")
+        self._count("in_flight")
+        ok = False
+        try:
+            for attempt in range(self.max_attempts):
+                span.set(attempts=attempt + 1)
+                remaining = deadline_at - time.monotonic()
+                if remaining <= 0 or not self._thread_slots.acquire(timeout=remaining):
+                    self._count("deadline_exceeded")
+                    raise DeadlineExceeded(f"{name}: no concurrency slot before the deadline")
+                # Checked once a slot is held, so a half-open probe never waits on local congestion
+                try:
+                    self._check_breaker(name)
+                except CircuitOpenError:
+                    self._thread_slots.release()
+                    raise
+                delay = None
+                try:
+                    result = fn()
+                except Exception as e:
+                    if not is_retryable(e):
+                        self.breaker.record_success()
+                        raise
+                    self.breaker.record_failure()
+                    delay = self._next_delay(name, attempt, deadline_at)
+                    if delay is None:
+                        raise
+                except BaseException:
+                    # KeyboardInterrupt/SystemExit mid-probe: no outcome, don't wedge half-open
+                    self.breaker.release_probe()
+                    raise
+                finally:
+                    self._thread_slots.release()
+
+                if delay is not None:
+                    # Backoff happens outside the slot so waiting callers can use it
+                    time.sleep(delay)
+                    continue
+                self.breaker.record_success()
+                ok = True
+                return result
+        finally:
+            self._finish(started, ok)
+
+    def _async_slots(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._loop_slots:
+                self._loop_slots[loop] = asyncio.Semaphore(self.max_concurrency)
+            return self._loop_slots[loop]
+
+    async def acall(self, fn, deadline=None, name="llm"):
+        """Awaits fn() (a coroutine factory) under the same policy as call()."""
+        with get_tracer().span(f"llm.{name}") as span:
+            return await self._acall(fn, deadline, name, span)
+
+    async def _acall(self, fn, deadline, name, span):
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        started = time.monotonic()
+        slots = self._async_slots()
+        self._count("calls")
+        self._count("in_flight")
+        ok = False
+        try:
+            for attempt in range(self.max_attempts):
+                span.set(attempts=attempt + 1)
+                # Queueing for a local slot is not Gemini's fault: it never counts against the breaker
+                try:
+                    remaining = deadline_at - time.monotonic()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    async with asyncio.timeout(remaining):
+                        await slots.acquire()
+                except (asyncio.TimeoutError, TimeoutError):
+                    self._count("deadline_exceeded")
+                    raise DeadlineExceeded(f"{name}: no concurrency slot before the deadline") from None
+                try:
+                    self._check_breaker(name)
+                except CircuitOpenError:
+                    slots.release()
+                    raise
+                delay = None
+                try:
+                    async with asyncio.timeout(deadline_at - time.monotonic()):
+                        result = await fn()
+                except Exception as e:
+                    if isinstance(e, (asyncio.TimeoutError, TimeoutError)) and time.monotonic() >= deadline_at:
+                        self.breaker.record_failure()
+                        self._count("deadline_exceeded")
+                        raise DeadlineExceeded(f"{name}: deadline reached after {attempt + 1} attempt(s)") from e
+                    if not is_retryable(e):
+                        self.breaker.record_success()
+                        raise
+                    self.breaker.record_failure()
+                    delay = self._next_delay(name, attempt, deadline_at)
+                    if delay is None:
+                        raise
+                except BaseException:
+                    # Cancelled (client disconnect, auto-mode fallback): no outcome, don't wedge half-open
+                    self.breaker.release_probe()
+                    raise
+                finally:
+                    slots.release()
+
+                if delay is not None:
+                    # Backoff happens outside the slot so waiting callers can use it
+                    await asyncio.sleep(delay)
+                    continue
+                self.breaker.record_success()
+                ok = True
+                return result
+        finally:
+            self._finish(started, ok)
+
+    def stats(self):
+        with self._lock:
+            latencies = list(self._latencies)
+            metrics = dict(self.metrics)
+
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            **metrics,
+            "breaker_state": self.breaker.state,
+            "latency_p50_ms": ms(percentile(latencies, 0.50)),
+            "latency_p95_ms": ms(percentile(latencies, 0.95)),
+            "latency_p99_ms": ms(percentile(latencies, 0.99)),
+        }
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def get_gateway():
+    """Process-wide gateway configured from LLM_* environment variables."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway(
+                max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+                deadline=float(os.getenv("LLM_DEADLINE_SECONDS", "30")),
+                max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "6")),
+                base_delay=float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5")),
+                max_delay=float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "8")),
+                failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+                reset_timeout=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30")),
+            )
+        return _gateway
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Process-wide Gemini client, built on first use so importing the backend never loads google.genai."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from google import genai
+            _client = genai.Client()
+        return _client
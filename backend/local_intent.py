@@ -0,0 +1,210 @@
+import re
+import threading
+import time
+from typing import get_args
+from backend import user_intent
+from backend.knowledge_base import load_champion_names
+from backend.schemas import StrategicMechanic, ValidArchetype
+
+# Same normalizations the Router field descriptions ask Gemini to apply
+POSITION_SYNONYMS = {
+    "top": "Top", "toplane": "Top", "toplaner": "Top", "toplaners": "Top",
+    "jungle": "Jungle", "jungler": "Jungle", "junglers": "Jungle", "jg": "Jungle", "jng": "Jungle", "jgl": "Jungle",
+    "mid": "Mid", "middle": "Mid", "midlane": "Mid", "midlaner": "Mid", "midlaners": "Mid",
+    "bot": "Bot", "bottom": "Bot", "botlane": "Bot", "adc": "Bot", "adcs": "Bot", "ad carry": "Bot",
+    "support": "Support", "supports": "Support", "supp": "Support", "sup": "Support", "sp": "Support",
+}
+
+MECHANIC_SYNONYMS = {
+    "Grievous Wounds": ["grievous wounds", "grievous", "anti heal", "antiheal", "healing reduction", "heal reduction", "gw"],
+    "Projectile Block": ["projectile block", "projectile blocking", "windwall", "wind wall", "block projectiles"],
+    "High Sustain": ["high sustain", "sustain", "self heal", "self healing"],
+    "Shield Reave": ["shield reave", "shield break", "shield breaking", "shieldbreak", "anti shield"],
+    "Shielding": ["shielding", "shields"],
+    "True Sight": ["true sight", "truesight", "stealth detection"],
+    "Invisibility": ["invisibility", "invisible", "stealth", "camouflage"],
+    "Knock-up": ["knock up", "knock ups", "knockup", "knockups", "airborne"],
+    "High Mobility": ["high mobility", "mobility"],
+    "Anti-Dash": ["anti dash", "antidash", "grounding"],
+    "Unstoppable": ["unstoppable", "cc immunity", "cc immune"],
+    "Cleanse": ["cleanse", "cleanses", "qss"],
+    "Anti-Auto Attack": ["anti auto attack", "anti auto", "blind", "blinds"],
+    "Projectile Reliant": ["projectile reliant", "skillshot reliant"],
+}
+
+# Community nicknames and old/internal names, folded -> canonical KB name.
+# Entries whose champion isn't in the KB are ignored.
+CHAMPION_ALIASES = {
+    "vlad": "Vladimir", "monkeyking": "Wukong", "monkey king": "Wukong", "wu": "Wukong",
+    "mf": "Miss Fortune", "tf": "Twisted Fate", "gp": "Gangplank", "lb": "LeBlanc",
+    "asol": "Aurelion Sol", "a sol": "Aurelion Sol", "j4": "Jarvan IV", "jarvan": "Jarvan IV",
+    "yi": "Master Yi", "mundo": "Dr. Mundo", "nunu": "Nunu & Willump", "cho": "Cho'Gath",
+    "kog": "Kog'Maw", "kha": "Kha'Zix", "rek": "Rek'Sai", "vel": "Vel'Koz", "tahm": "Tahm Kench",
+    "xin": "Xin Zhao", "lee": "Lee Sin", "heimer": "Heimerdinger", "donger": "Heimerdinger",
+    "fiddle": "Fiddlesticks", "morde": "Mordekaiser", "naut": "Nautilus", "blitz": "Blitzcrank",
+    "cass": "Cassiopeia", "kat": "Katarina", "trist": "Tristana", "ori": "Orianna", "sej": "Sejuani",
+    "ww": "Warwick", "voli": "Volibear", "renata": "Renata Glasc", "ez": "Ezreal", "cait": "Caitlyn",
+    "liss": "Lissandra", "malz": "Malzahar", "malph": "Malphite", "panth": "Pantheon",
+    "trynd": "Tryndamere", "tryn": "Tryndamere", "kass": "Kassadin", "noc": "Nocturne",
+    "hec": "Hecarim", "sera": "Seraphine", "yuu": "Yuumi", "raka": "Soraka", "ali": "Alistar",
+    "aurelion": "Aurelion Sol", "eve": "Evelynn",
+}
+
+DRAFT_WORDS = {"draft", "team", "comp", "composition", "lineup"}
+
+COUNTER_WORDS = {"counter", "counters", "countering", "counterpick", "counterpicks", "beat", "beats", "against", "vs", "versus", "into"}
+
+# Verbs that make the champion right before them the subject: "Darius counters ...", "zed beats ..."
+COUNTER_VERBS = {"counter", "counters", "countering", "counterpick", "counterpicks", "beat", "beats"}
+
+# "who does Darius counter", "is Zed good against": an auxiliary right before the champion
+AUXILIARIES = {"does", "do", "did", "can", "will", "would", "is"}
+
+# Negated or ban questions ("when should I not pick against zed", "who to ban vs zed") are a different question
+NEGATION_WORDS = {"not", "dont", "never", "avoid", "without", "cant", "cannot", "shouldnt", "wont"}
+BAN_WORDS = {"ban", "bans", "banned", "banning"}
+
+# Anything that smells like lore/skins/stats is left to the LLM (it may be UnknownIntent)
+OFF_TOPIC_WORDS = {"lore", "skin", "skins", "story", "build", "builds", "item", "items", "rune", "runes", "stats", "patch", "winrate"}
+
+MAX_PHRASE = 3
+
+def fold(text):
+    # Lowercase, drop apostrophes (Kai'Sa -> kaisa) and turn other punctuation into spaces
+    text = text.lower().replace("'", "").replace("’", "")
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+def plural(word):
+    return word[:-1] + "ies" if word.endswith("y") else word + "s"
+
+class LocalIntentParser:
+    """Deterministic lexicon/grammar classifier that resolves simple queries without an LLM call.
+
+    parse() returns a Router choice only when exactly one reading of the query is possible,
+    otherwise None so the caller falls back to Gemini.
+    """
+    def __init__(self, champions=None):
+        names = load_champion_names() if champions is None else [champ['name'] for champ in champions]
+
+        # folded phrase -> (kind, canonical value)
+        self.lexicon = {}
+        for name in names:
+            self.lexicon[fold(name)] = ("champion", name)
+            self.lexicon.setdefault(fold(name).replace(" ", ""), ("champion", name))
+        known = set(names)
+        for alias, name in CHAMPION_ALIASES.items():
+            if name in known:
+                self.lexicon.setdefault(alias, ("champion", name))
+        for phrase, position in POSITION_SYNONYMS.items():
+            self.lexicon[phrase] = ("position", position)
+        for mechanic in get_args(StrategicMechanic):
+            self.lexicon[fold(mechanic)] = ("mechanic", mechanic)
+            for phrase in MECHANIC_SYNONYMS.get(mechanic, []):
+                self.lexicon[phrase] = ("mechanic", mechanic)
+        for archetype in get_args(ValidArchetype):
+            self.lexicon[fold(archetype)] = ("archetype", archetype)
+            self.lexicon[plural(fold(archetype))] = ("archetype", archetype)
+        self.lexicon["marksmen"] = ("archetype", "Marksman")
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.total_seconds = 0.0
+
+    def tag(self, query):
+        """Greedy longest-match of the folded query against the lexicon."""
+        tokens = fold(query).split()
+        found = []
+        i = 0
+        while i < len(tokens):
+            for size in range(min(MAX_PHRASE, len(tokens) - i), 0, -1):
+                entry = self.lexicon.get(" ".join(tokens[i:i + size]))
+                if entry:
+                    found.append(entry)
+                    i += size
+                    break
+            else:
+                found.append(("word", tokens[i]))
+                i += 1
+        return found
+
+    @staticmethod
+    def _champion_is_subject(tags):
+        """True when the champion is the one doing the countering, not the one to counter."""
+        for i, (kind, _) in enumerate(tags):
+            if kind != "champion":
+                continue
+            after = tags[i + 1] if i + 1 < len(tags) else None
+            before = tags[i - 1] if i > 0 else None
+            if after is not None and after[0] == "word" and after[1] in COUNTER_VERBS:
+                return True
+            later = {value for k, value in tags[i + 1:] if k == "word"}
+            if before is not None and before[0] == "word" and before[1] in AUXILIARIES and later & COUNTER_WORDS:
+                return True
+        return False
+
+    def _resolve(self, query):
+        tags = self.tag(query)
+        words = {value for kind, value in tags if kind == "word"}
+        if words & (OFF_TOPIC_WORDS | NEGATION_WORDS | BAN_WORDS):
+            return None
+
+        def values(kind):
+            return {value for k, value in tags if k == kind}
+
+        champions = values("champion")
+        # Order of appearance, for team drafts
+        ordered_champions = list(dict.fromkeys(value for kind, value in tags if kind == "champion"))
+        ordered_positions = list(dict.fromkeys(value for kind, value in tags if kind == "position"))
+        positions = values("position")
+        mechanics = values("mechanic")
+        archetypes = values("archetype")
+        is_counter = bool(words & COUNTER_WORDS)
+
+        # "Marksman" is both an archetype and the Bot lane; outside a counter question it means the lane
+        if not is_counter and archetypes == {"Marksman"}:
+            archetypes = set()
+            positions.add("Bot")
+
+        if len(champions) > 1 and is_counter and words & DRAFT_WORDS and not mechanics and not archetypes:
+            return user_intent.TeamDraft(intent_type="team_draft", enemy_champions=ordered_champions, open_roles=ordered_positions)
+
+        if len(positions) > 1:
+            return None
+        position = next(iter(positions), None)
+
+        if len(champions) == 1 and is_counter and not mechanics and not archetypes and not self._champion_is_subject(tags):
+            return user_intent.CounterPick(intent_type="counter_pick", enemy_champion=champions.pop(), my_position=position)
+
+        if not champions and len(mechanics) == 1 and not archetypes and not is_counter:
+            return user_intent.MechanicSearch(intent_type="mechanic_search", mechanic_concept=mechanics.pop(), my_position=position)
+
+        if not champions and len(archetypes) == 1 and not mechanics and is_counter:
+            return user_intent.ArchetypeCounters(intent_type="archetype_counter", enemy_archetype=archetypes.pop(), my_position=position)
+
+        return None
+
+    def parse(self, query):
+        start = time.perf_counter()
+        intent = self._resolve(query)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.total_seconds += elapsed
+            if intent is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return intent
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "queries": total,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "llm_calls_saved": self.hits,
+                "avg_latency_us": round(self.total_seconds / total * 1e6, 1) if total else 0.0,
+            }
@@ -1,16 +1,22 @@
-from graph_retriever import GraphRetriever, Switchboard
-from responder import Responder
 import os
-from neo4j import GraphDatabase
-from dotenv import load_dotenv
-from google import genai
-import time
-from google.genai.errors import ServerError
+import sys
+
+# Allow `python backend/main.py` as well as `python -m backend.main`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.graph_retriever import Switchboard, build_graph_retriever
+from backend.responder import Responder
+from backend.tracing import get_tracer, serve_metrics
+from backend.warmup import prewarm
+from backend.tool_agent import ToolAgent, pipeline_mode
 
 def run_app():
     sb = Switchboard()
-    graph = GraphRetriever()
+    graph = build_graph_retriever()
     responder = Responder()
+    agent = ToolAgent(sb, responder) if pipeline_mode() == "tools" else None
+    tracer = get_tracer()
+    serve_metrics()
+    prewarm(graph)
     print("System Ready.\n")
     
     while True:
@@ -19,17 +25,41 @@ def run_app():
             break
         
         try:
-            time.sleep(1)
-            graph_data, context = sb.handle_query(user_query, graph)
-            if graph_data == "NA":
-                print("GraphLeague: I can't answer that right now.")
-                continue
-            time.sleep(1)
-            final_response = responder.generate_response(graph_data, context, user_query)
-            print(f"GraphLeague: {final_response.text}")
+            with tracer.trace() as trace_id:
+                if agent is not None:
+                    routed, stream = agent.answer(user_query, graph, trace_id=trace_id)
+                else:
+                    routed, stream = sb.route(user_query, graph, trace_id=trace_id), None
+                if routed.graph_data == "NA":
+                    print("GraphLeague: I can't answer that right now.")
+                    continue
+                if routed.suggestion_text:
+                    print(f"GraphLeague: {routed.suggestion_text}")
+                    continue
+                if stream is None:
+                    stream = responder.stream_response(routed.graph_data, routed.context, user_query, intent=routed.intent, trace_id=trace_id)
+                print("GraphLeague: ", end="", flush=True)
+                for chunk in stream:
+                    print(chunk, end="", flush=True)
+                print()
+                print(f"(first token {stream.timings()['ttft_ms']}ms, total {stream.timings()['total_ms']}ms, "
+                      f"prompt ~{stream.prompt_stats.get('prompt_tokens', stream.prompt_stats.get('prompt_tokens_est'))} tokens)")
+            if os.getenv("TRACE_PRINT"):
+                for span in tracer.spans_for(trace_id):
+                    print(f"  {span['name']:<22}{span['duration_ms']:>10.1f}ms  {span['attrs']}")
         except Exception as e:
             print(f"Error processing request: {e}")
 
+    if sb.local_parser is not None:
+        print(f"Local intent parser: {sb.local_parser.stats()}")
+    if sb.intent_cache is not None:
+        print(f"Intent cache: {sb.intent_cache.stats()}")
+    print(f"LLM gateway: {sb.gateway.stats()}")
+    if agent is not None:
+        print(f"Tool agent: {agent.stats()}")
+    print(f"Responder: {responder.stats()}")
+    if hasattr(graph, "stats"):
+        print(f"Graph: {graph.stats()}")
     graph.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,132 @@
+import os
+import time
+import numpy as np
+from typing import get_args
+from backend.graph_builder import LOGIC_RULES, ARCHETYPE_RULES
+from backend.knowledge_base import kb_version
+from backend.schemas import StrategicMechanic, ValidArchetype, ValidPosition
+
+# Same weights as the get_counter_picks Cypher: archetype counter x1, exploited weakness x2
+ARCHETYPE_WEIGHT = 1
+MECHANIC_WEIGHT = 2
+
+MATRIX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'matchup_matrix.npz')
+
+class MatchupMatrix:
+    """Precomputed champion-vs-champion scores.
+
+    Rows are the enemy and columns the candidate pick, so offense[e, me] is how hard
+    `me` counters `e` and a counter-pick lookup is a masked top-k over row `e`.
+    The unweighted hit counts are kept so reweighting never needs the KB again.
+    """
+    def __init__(self, names, roles, arch_hits, mech_hits, version=None, arch_weight=ARCHETYPE_WEIGHT, mech_weight=MECHANIC_WEIGHT):
+        self.names = list(names)
+        self.version = version
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.role_names = list(get_args(ValidPosition))
+        self.roles = np.asarray(roles, dtype=bool)              # champion x role
+        self.arch_hits = np.asarray(arch_hits, dtype=np.int16)  # enemy x candidate
+        self.mech_hits = np.asarray(mech_hits, dtype=np.int16)  # enemy x candidate
+
+        # Rank of each name in sorted order, used as the final tie-break
+        self.name_rank = np.empty(len(self.names), dtype=np.int32)
+        self.name_rank[np.argsort(np.array(self.names, dtype=object))] = np.arange(len(self.names))
+
+        self.reweight(arch_weight, mech_weight)
+
+    @classmethod
+    def from_champions(cls, champions, arch_weight=ARCHETYPE_WEIGHT, mech_weight=MECHANIC_WEIGHT):
+        names = [champ['name'] for champ in champions]
+        role_names = list(get_args(ValidPosition))
+        archetypes = list(get_args(ValidArchetype))
+        mechanics = list(get_args(StrategicMechanic))
+        arch_idx = {name: i for i, name in enumerate(archetypes)}
+        mech_idx = {name: i for i, name in enumerate(mechanics)}
+
+        n = len(champions)
+        roles = np.zeros((n, len(role_names)), dtype=bool)
+        A = np.zeros((n, len(archetypes)), dtype=np.int16)  # champion IS_A archetype
+        H = np.zeros((n, len(mechanics)), dtype=np.int16)   # champion HAS_MECHANIC mechanic
+        W = np.zeros((n, len(mechanics)), dtype=np.int16)   # champion WEAK_TO mechanic
+        C = np.zeros((len(archetypes), len(archetypes)), dtype=np.int16)  # source COUNTERS target
+
+        for i, champ in enumerate(champions):
+            A[i, arch_idx[champ['archetype']]] = 1
+            for role in champ['primary_position']:
+                roles[i, role_names.index(role)] = True
+            for mech in champ['mechanics']:
+                H[i, mech_idx[mech['name']]] = 1
+                if mech['name'] in LOGIC_RULES:
+                    W[i, mech_idx[LOGIC_RULES[mech['name']]]] = 1
+
+        for source, targets in ARCHETYPE_RULES.items():
+            for target in targets:
+                C[arch_idx[source], arch_idx[target['target']]] = 1
+
+        # arch_hits[e, me] = 1 if me's archetype COUNTERS e's archetype
+        arch_hits = (A @ C @ A.T).T
+        # mech_hits[e, me] = number of e's weaknesses that me has the mechanic for
+        mech_hits = W @ H.T
+        version = kb_version(champions, (LOGIC_RULES, ARCHETYPE_RULES))
+        return cls(names, roles, arch_hits, mech_hits, version, arch_weight, mech_weight)
+
+    def reweight(self, arch_weight=ARCHETYPE_WEIGHT, mech_weight=MECHANIC_WEIGHT):
+        self.arch_weight = arch_weight
+        self.mech_weight = mech_weight
+        self.offense = (arch_weight * self.arch_hits + mech_weight * self.mech_hits).astype(np.int32)
+        # What the enemy does to the candidate is the candidate's offense against them
+        self.defense = np.ascontiguousarray(self.offense.T)
+        self.net = self.offense - self.defense
+
+    def lane_mask(self, position=None):
+        if not position:
+            return np.ones(len(self.names), dtype=bool)
+        if position not in self.role_names:
+            return np.zeros(len(self.names), dtype=bool)
+        return self.roles[:, self.role_names.index(position)]
+
+    def top_counters(self, enemy_name, position=None, limit=2):
+        """Returns (candidate index, net, offense, defense) for the best counters to enemy_name."""
+        enemy = self.index.get(enemy_name)
+        if enemy is None:
+            return []
+
+        net = self.net[enemy]
+        offense = self.offense[enemy]
+        candidates = np.flatnonzero(self.lane_mask(position) & (net > 0))
+
+        # ORDER BY netScore DESC, offensiveScore DESC, then name
+        order = np.lexsort((self.name_rank[candidates], -offense[candidates], -net[candidates]))
+        picked = candidates[order[:limit]]
+        return [(int(i), int(net[i]), int(offense[i]), int(self.defense[enemy, i])) for i in picked]
+
+    def save(self, path=MATRIX_FILE):
+        np.savez_compressed(
+            path,
+            names=np.array(self.names),
+            roles=self.roles,
+            arch_hits=self.arch_hits,
+            mech_hits=self.mech_hits,
+            version=np.array(self.version or ""),
+        )
+
+    @classmethod
+    def load(cls, path=MATRIX_FILE, arch_weight=ARCHETYPE_WEIGHT, mech_weight=MECHANIC_WEIGHT):
+        with np.load(path) as data:
+            return cls(data['names'].tolist(), data['roles'], data['arch_hits'], data['mech_hits'], str(data['version']), arch_weight, mech_weight)
+
+def load_matchup_matrix(champions, path=MATRIX_FILE):
+    """Uses the seed-time artifact when it matches the given champions, else computes it."""
+    if os.path.exists(path):
+        matrix = MatchupMatrix.load(path)
+        if matrix.version == kb_version(champions, (LOGIC_RULES, ARCHETYPE_RULES)):
+            return matrix
+    return MatchupMatrix.from_champions(champions)
+
+def build_matchup_artifact(champions, path=MATRIX_FILE):
+    start = time.perf_counter()
+    matrix = MatchupMatrix.from_champions(champions)
+    matrix.save(path)
+    n = len(matrix.names)
+    print(f"Matchup matrix ({n}x{n}) written to {path} in {(time.perf_counter() - start) * 1000:.1f}ms")
+    return matrix
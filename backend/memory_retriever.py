@@ -0,0 +1,160 @@
+from typing import get_args
+from backend.graph_builder import LOGIC_RULES, ARCHETYPE_RULES
+from backend.knowledge_base import load_champions
+from backend.matchup_matrix import load_matchup_matrix
+from backend.schemas import ValidPosition
+
+ROLES = list(get_args(ValidPosition))
+
+def iter_bits(bits):
+    # Yields the index of every set bit, lowest first
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+class InMemoryGraphRetriever:
+    """Answers the GraphRetriever queries from in-process indexes instead of Neo4j.
+
+    The indexes mirror what graph_builder.py writes to the graph, so results match
+    the Cypher queries row for row (ties are broken by champion name).
+    """
+    def __init__(self, champions=None):
+        if champions is None:
+            champions = load_champions()
+
+        self.names = []
+        self.index = {}
+        self.archetype = []
+
+        # Role / archetype membership as bitsets over champion indexes
+        self.role_bits = {role: 0 for role in ROLES}
+        self.archetype_bits = {}
+
+        # HAS_MECHANIC: per champion {mechanic: details} and mechanic -> [champion index] postings
+        self.mechanics = []
+        self.mechanic_postings = {}
+
+        # WEAK_TO: per champion {counter mechanic: [distinct reasons]}
+        self.weaknesses = []
+
+        # COUNTERS: source archetype -> {target archetype: reason}, and the reverse adjacency
+        self.counters = {}
+        self.countered_by = {}
+        for source, targets in ARCHETYPE_RULES.items():
+            for target in targets:
+                self.counters.setdefault(source, {})[target['target']] = target['reason']
+                self.countered_by.setdefault(target['target'], []).append((source, target['reason']))
+
+        for champ in champions:
+            self._add_champion(champ)
+
+        self.all_bits = (1 << len(self.names)) - 1
+
+        # Scores for every pair come from the precomputed matrix; reasons are only built for the rows returned
+        self.matchups = load_matchup_matrix(champions)
+
+    def _add_champion(self, champ):
+        idx = len(self.names)
+        bit = 1 << idx
+        self.names.append(champ['name'])
+        self.index[champ['name']] = idx
+        self.archetype.append(champ['archetype'])
+        self.archetype_bits[champ['archetype']] = self.archetype_bits.get(champ['archetype'], 0) | bit
+
+        for role in champ['primary_position']:
+            self.role_bits[role] = self.role_bits.get(role, 0) | bit
+
+        has = {}
+        weak = {}
+        for mech in champ['mechanics']:
+            # MERGE on the edge + SET description: the last entry wins
+            has[mech['name']] = mech['details']
+            if mech['name'] in LOGIC_RULES:
+                counter_mech = LOGIC_RULES[mech['name']]
+                reason = f"Vulnerable to {counter_mech} due to {mech['name']}: {mech.get('details', '')}"
+                reasons = weak.setdefault(counter_mech, [])
+                if reason not in reasons:
+                    reasons.append(reason)
+
+        for mech_name in has:
+            self.mechanic_postings.setdefault(mech_name, []).append(idx)
+        self.mechanics.append(has)
+        self.weaknesses.append(weak)
+
+    def close(self):
+        pass
+
+    def _lane_bits(self, position):
+        if not position:
+            return self.all_bits
+        return self.role_bits.get(position, 0)
+
+    def score_pair(self, attacker, defender):
+        # Mirrors one side of the Cypher: archetype counter (x1) + exploited weaknesses (x2)
+        reasons = []
+        arch_reason = self.counters.get(self.archetype[attacker], {}).get(self.archetype[defender])
+        arch_hits = 0
+        if arch_reason:
+            arch_hits = 1
+            reasons.append(arch_reason)
+
+        mech_hits = 0
+        for counter_mech, weak_reasons in self.weaknesses[defender].items():
+            if counter_mech in self.mechanics[attacker]:
+                mech_hits += 1
+                reasons.extend(weak_reasons)
+
+        return (arch_hits * 1) + (mech_hits * 2), reasons
+
+    def get_counter_picks(self, enemy_name, position=None, limit=2):
+        enemy = self.index.get(enemy_name)
+        if enemy is None:
+            return []
+
+        results = []
+        for me, net, offense, defense in self.matchups.top_counters(enemy_name, position, limit):
+            _, pros = self.score_pair(me, enemy)
+            _, cons = self.score_pair(enemy, me)
+            results.append({
+                "Champion": self.names[me],
+                "Score": net,
+                "Offense": offense,
+                "Defense": defense,
+                "Reasoning": pros,
+                "Risks": cons,
+            })
+        return results
+
+    def get_counter_picks_batch(self, pairs, limit=2):
+        from backend.graph_retriever import batch_result
+        pairs = [(enemy, position) for enemy, position in pairs]
+        return batch_result(pairs, [self.get_counter_picks(enemy, position, limit) for enemy, position in pairs])
+
+    def find_mechanic_holders(self, mechanic_name, position=None):
+        lane = self._lane_bits(position)
+        holders = sorted(
+            self.names[idx] for idx in self.mechanic_postings.get(mechanic_name, [])
+            if lane >> idx & 1
+        )
+        return [
+            {"Champion": name, "Reasoning": [self.mechanics[self.index[name]][mechanic_name]]}
+            for name in holders[:5]
+        ]
+
+    def get_archetype_counters(self, target_archetype, position=None):
+        lane = self._lane_bits(position)
+        rows = []
+        for counter_class, reason in self.countered_by.get(target_archetype, []):
+            for idx in iter_bits(self.archetype_bits.get(counter_class, 0) & lane):
+                rows.append({"Champion": self.names[idx], "Class": counter_class, "Reasoning": [reason]})
+
+        rows.sort(key=lambda row: row["Champion"])
+        return rows[:5]
+
+    def get_draft_picks(self, enemy_names, open_roles=None, excluded=None, limit=3, joint=False):
+        # Imported here: draft.py builds on this module
+        from backend.draft import DraftOptimizer
+        if not hasattr(self, "_draft"):
+            self._draft = DraftOptimizer(self)
+        return self._draft.draft(enemy_names, open_roles, excluded or (), limit, joint)
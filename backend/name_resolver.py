@@ -0,0 +1,120 @@
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+from backend.knowledge_base import load_champion_names
+from backend.local_intent import CHAMPION_ALIASES, fold
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def edit_distance(a, b, limit=None):
+    """Optimal string alignment distance (Levenshtein plus adjacent transpositions)."""
+    if abs(len(a) - len(b)) > (limit if limit is not None else len(a) + len(b)):
+        return abs(len(a) - len(b))
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+@dataclass
+class Resolution:
+    query: str
+    name: Optional[str] = None
+    method: str = "none"  # exact | alias | prefix | fuzzy | none
+    suggestions: List[str] = field(default_factory=list)
+
+class NameResolver:
+    """Maps raw champion mentions (any casing, punctuation, nicknames, typos) to KB names.
+
+    Exact and alias hits are dict lookups; everything else goes through a trigram index
+    and edit distance over the few candidates it returns.
+    """
+    def __init__(self, champions=None, aliases=CHAMPION_ALIASES, max_suggestions=3):
+        self.names = load_champion_names() if champions is None else [champ['name'] for champ in champions]
+        self.max_suggestions = max_suggestions
+
+        # compact folded form ("kaisa", "leesin") -> name
+        self.exact = {}
+        for name in self.names:
+            self.exact[fold(name).replace(" ", "")] = name
+        known = set(self.names)
+        self.aliases = {fold(alias).replace(" ", ""): name for alias, name in aliases.items() if name in known}
+
+        self.keys = list(self.exact)
+        self.gram_counts = []
+        self.postings = {}
+        for idx, key in enumerate(self.keys):
+            grams = trigrams(key)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(idx)
+
+        self.lookups = 0
+        self.total_seconds = 0.0
+
+    def resolve(self, raw):
+        start = time.perf_counter()
+        resolution = self._resolve(raw)
+        self.lookups += 1
+        self.total_seconds += time.perf_counter() - start
+        return resolution
+
+    def _resolve(self, raw):
+        key = fold(raw or "").replace(" ", "")
+        if not key:
+            return Resolution(raw)
+        if key in self.exact:
+            return Resolution(raw, self.exact[key], "exact")
+        if key in self.aliases:
+            return Resolution(raw, self.aliases[key], "alias")
+
+        # A prefix that only one champion has ("vladi", "tahmk")
+        if len(key) >= 4:
+            prefixed = [k for k in self.keys if k.startswith(key)]
+            if len(prefixed) == 1:
+                return Resolution(raw, self.exact[prefixed[0]], "prefix")
+
+        grams = trigrams(key)
+        shared = {}
+        for gram in grams:
+            for idx in self.postings.get(gram, ()):
+                shared[idx] = shared.get(idx, 0) + 1
+        if not shared:
+            return Resolution(raw)
+
+        # Dice coefficient shortlist, then edit distance decides
+        shortlist = sorted(shared, key=lambda idx: -2 * shared[idx] / (len(grams) + self.gram_counts[idx]))[:6]
+        limit = max(1, len(key) // 4)
+        scored = sorted((edit_distance(key, self.keys[idx], limit + 2), self.keys[idx]) for idx in shortlist)
+
+        best_distance, best_key = scored[0]
+        runner_up = scored[1][0] if len(scored) > 1 else None
+        if best_distance <= limit and (runner_up is None or runner_up > best_distance):
+            return Resolution(raw, self.exact[best_key], "fuzzy")
+
+        suggestions = [self.exact[k] for d, k in scored if d <= limit + 2][:self.max_suggestions]
+        return Resolution(raw, None, "none", suggestions)
+
+    def stats(self):
+        return {
+            "lookups": self.lookups,
+            "avg_latency_us": round(self.total_seconds / self.lookups * 1e6, 1) if self.lookups else 0.0,
+        }
+
+def suggestion_message(suggestions):
+    """User-facing text for champion mentions that didn't resolve: {raw: [suggestions]}."""
+    parts = []
+    for raw, names in suggestions.items():
+        if names:
+            parts.append(f"I couldn't find a champion called '{raw}'. Did you mean {', '.join(names)}?")
+        else:
+            parts.append(f"I couldn't find a champion called '{raw}'.")
+    return " ".join(parts)
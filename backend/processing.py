@@ -1,20 +1,22 @@
+import argparse
 import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from backend.schemas import ChampionNode
 from google import genai
-import time
-from google.genai.errors import ServerError
+from backend.llm_gateway import CircuitOpenError, LLMGateway, LLMUnavailable
 
 load_dotenv()
-client = genai.Client()
 
 INPUT_FILE = 'backend/champions.json'
 OUTPUT_FILE = 'backend/processed_champions_v4.json'
+CHECKPOINT_FILE = 'backend/processed_champions_v4.checkpoint.jsonl'
 
-# load json
-with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-    input_json = json.load(f)
+# Extraction is offline, so each champion gets a longer budget than a user request
+EXTRACTION_DEADLINE = 300
 
 logic_rules = """
         RULES:
@@ -54,29 +56,65 @@ logic_rules = """
         - "Catcher": Relies on fishing for picks/hooks (e.g., Thresh, Blitzcrank, Morgana).
         """
 
-processed_ids = set()
-output_list = []
+class TokenBucket:
+    """Shared requests/min + tokens/min limiter. Workers block in acquire() until both budgets allow a call."""
+    def __init__(self, requests_per_min, tokens_per_min):
+        self.request_capacity = requests_per_min
+        self.token_capacity = tokens_per_min
+        self.requests = float(requests_per_min)
+        self.tokens = float(tokens_per_min)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
 
-if os.path.exists(OUTPUT_FILE):
-    with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
-        try:
-            saved_data = json.load(f)
-            output_list = [ChampionNode(**item) for item in saved_data]
-            processed_ids = {item.name for item in output_list}
-            print(f"Loaded {len(output_list)} champions from previous run.")
-        except (json.JSONDecodeError, KeyError):
-            print("Output file corrupted or empty. Starting fresh.")
-
-for champion_id, champion_raw_data in input_json["data"].items():
-    
-    if champion_id in processed_ids:
-        print(f"Skipping {champion_id} (already done)")
-        continue
-        
-    print(f"Processing {champion_id}...")
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        self.requests = min(self.request_capacity, self.requests + elapsed * self.request_capacity / 60)
+        self.tokens = min(self.token_capacity, self.tokens + elapsed * self.token_capacity / 60)
+
+    def acquire(self, tokens):
+        tokens = min(tokens, self.token_capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self.requests >= 1 and self.tokens >= tokens:
+                    self.requests -= 1
+                    self.tokens -= tokens
+                    return
+                # Time until both buckets have refilled enough
+                wait = max(
+                    (1 - self.requests) * 60 / self.request_capacity,
+                    (tokens - self.tokens) * 60 / self.token_capacity,
+                )
+            time.sleep(max(wait, 0.01))
+
+class Progress:
+    """Prints throughput and ETA as champions complete."""
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def update(self, champion_id, ok):
+        with self._lock:
+            self.done += 1
+            if not ok:
+                self.failed += 1
+            elapsed = time.perf_counter() - self.start
+            rate = self.done / elapsed if elapsed else 0.0
+            eta = (self.total - self.done) / rate if rate else 0.0
+            status = "ok" if ok else "failed"
+            print(f"[{self.done}/{self.total}] {champion_id} {status} | {rate * 60:.1f} champs/min | ETA {eta:.0f}s", flush=True)
+
+def estimate_tokens(text):
+    # Rough 4 chars/token estimate plus headroom for the JSON we get back
+    return len(text) // 4 + 500
 
-    # Prompt Engineering
-    prompt = (
+def build_prompt(champion_id, champion_raw_data):
+    return (
         f"You are a League of Legends expert. Extract data for '{champion_id}' into the required JSON schema.\n\n"
         f"RAW DATA: {json.dumps(champion_raw_data)}\n\n"
         f"RULES:\n{logic_rules}\n"
@@ -88,47 +126,193 @@ for champion_id, champion_raw_data in input_json["data"].items():
         "Output valid JSON matching the ChampionNode schema."
     )
 
-    max_retries = 8
+def extract_champion(client, champion_id, champion_raw_data, limiter, gateway):
+    """Runs one Gemini extraction. Retries sleep in this worker only, so other champions keep going."""
+    prompt = build_prompt(champion_id, champion_raw_data)
+
+    def request():
+        # Every attempt, including retries, spends from the shared rate budget
+        limiter.acquire(estimate_tokens(prompt))
+        return client.models.generate_content(
+            model="gemini-2.5-flash",
+            contents=prompt,
+            config={
+                "response_mime_type": "application/json",
+                "response_schema": ChampionNode,
+                "temperature": 0.3
+            }
+        )
+
     response = None
-    
-    for attempt in range(max_retries):
+    while True:
         try:
-            response = client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt,
-                config={
-                    "response_mime_type": "application/json",
-                    "response_schema": ChampionNode,
-                    "temperature": 0.3
-                }
-            )
-            break
-        except ServerError as e:
-            wait = (2 ** attempt)
-            print(f"Server Error. Retrying in {wait}s...")
-            time.sleep(wait)
+            response = gateway.call(request, deadline=EXTRACTION_DEADLINE, name=f"extract {champion_id}")
+        except CircuitOpenError:
+            # An open circuit says Gemini is overloaded, not that this champion failed: wait it out
+            print(f"Circuit open, retrying {champion_id} in {gateway.breaker.reset_timeout:.0f}s")
+            time.sleep(gateway.breaker.reset_timeout)
+            continue
+        except LLMUnavailable as e:
+            print(f"Gave up on {champion_id}: {e}")
         except Exception as e:
             print(f"Fatal Error on {champion_id}: {e}")
-            break
+        break
     
-    # Save & parsing
+    # Parsing
     if response and response.text:
         try:
             data = json.loads(response.text)
-            champion_node = ChampionNode(**data)
-            
-            output_list.append(champion_node)
-            processed_ids.add(champion_id)
-            
-            # Incremental save
-            with open(OUTPUT_FILE, 'w', encoding='utf-8') as outfile:
-                json.dump([node.model_dump() for node in output_list], outfile, indent=4)
-            
-            print(f"Processed successfully: {champion_id}", flush=True)
-                
+            return ChampionNode(**data)
         except Exception as e:
             print(f"Validation Failed for {champion_id}: {e}")
-    
-    time.sleep(0.5)
+    return None
+
+class CheckpointLog:
+    """Append-only JSONL log of finished champions, one {"id", "node"} record per line.
+
+    Appending is O(1) per champion. fsync_every=1 makes every record durable before the
+    next one; larger values batch the fsyncs. A torn final line from a crash is dropped.
+    """
+    def __init__(self, path=CHECKPOINT_FILE, fsync_every=1):
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self._pending = 0
+        self._repair()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _repair(self):
+        # Cut a partially written last record so new appends start on a clean line
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def append(self, champion_id, node):
+        self._file.write(json.dumps({"id": champion_id, "node": node.model_dump()}) + "\n")
+        self._file.flush()
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    @staticmethod
+    def scan(path=CHECKPOINT_FILE):
+        """Returns {champion_id: ChampionNode} for every complete record; later records win."""
+        records = {}
+        if not os.path.exists(path):
+            return records
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    records[record["id"]] = ChampionNode(**record["node"])
+                except (json.JSONDecodeError, KeyError, ValueError):
+                    continue
+        return records
+
+def load_previous_output():
+    processed_ids = set()
+    output_list = []
+
+    if os.path.exists(OUTPUT_FILE):
+        with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
+            try:
+                saved_data = json.load(f)
+                output_list = [ChampionNode(**item) for item in saved_data]
+                processed_ids = {item.name for item in output_list}
+                print(f"Loaded {len(output_list)} champions from previous run.")
+            except (json.JSONDecodeError, KeyError):
+                print("Output file corrupted or empty. Starting fresh.")
+
+    # Work checkpointed since the last compaction
+    checkpointed = CheckpointLog.scan()
+    if checkpointed:
+        print(f"Recovered {len(checkpointed)} champions from checkpoint log.")
+        processed_ids |= set(checkpointed)
+        output_list.extend(checkpointed.values())
+    return processed_ids, output_list
+
+def compact(output_list):
+    """Writes the consolidated JSON graph_builder.py reads, then retires the checkpoint log."""
+    # Same champion extracted twice (e.g. before and after a crash): keep the newest
+    by_name = {node.name: node for node in output_list}
+    tmp_file = OUTPUT_FILE + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as outfile:
+        json.dump([node.model_dump() for node in by_name.values()], outfile, indent=4)
+        outfile.flush()
+        os.fsync(outfile.fileno())
+    os.replace(tmp_file, OUTPUT_FILE)
+
+    if os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
+    print(f"Compacted {len(by_name)} champions into {OUTPUT_FILE}")
+
+def run(workers=1, requests_per_min=120, tokens_per_min=1_000_000, fsync_every=1):
+    client = genai.Client()
+
+    # load json
+    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+        input_json = json.load(f)
+
+    processed_ids, output_list = load_previous_output()
+
+    pending = []
+    for champion_id, champion_raw_data in input_json["data"].items():
+        if champion_id in processed_ids:
+            print(f"Skipping {champion_id} (already done)")
+            continue
+        pending.append((champion_id, champion_raw_data))
+
+    print(f"Processing {len(pending)} champions with {workers} worker(s)...")
+    limiter = TokenBucket(requests_per_min, tokens_per_min)
+    progress = Progress(len(pending))
+    checkpoint = CheckpointLog(fsync_every=fsync_every)
+    save_lock = threading.Lock()
+    # Its own breaker and slots: a batch run must not trip or starve the one serving users
+    gateway = LLMGateway(max_concurrency=workers, deadline=EXTRACTION_DEADLINE)
+
+    def work(item):
+        champion_id, champion_raw_data = item
+        champion_node = extract_champion(client, champion_id, champion_raw_data, limiter, gateway)
+
+        if champion_node is not None:
+            with save_lock:
+                output_list.append(champion_node)
+                processed_ids.add(champion_id)
+                checkpoint.append(champion_id, champion_node)
+
+        progress.update(champion_id, champion_node is not None)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(work, pending))
+    finally:
+        checkpoint.close()
+
+    compact(output_list)
+    print(f"Processing Complete. {progress.done - progress.failed} succeeded, {progress.failed} failed.")
+    print(f"LLM gateway: {gateway.stats()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract champion data with Gemini.")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent extraction workers")
+    parser.add_argument("--rpm", type=int, default=120, help="Gemini requests per minute across all workers")
+    parser.add_argument("--tpm", type=int, default=1_000_000, help="Gemini tokens per minute across all workers")
+    parser.add_argument("--fsync-every", type=int, default=1, help="Checkpoint records per fsync (1 = every record)")
+    parser.add_argument("--compact-only", action="store_true", help="Fold the checkpoint log into the output JSON and exit")
+    args = parser.parse_args()
 
-print("Processing Complete.")
\ No newline at end of file
+    if args.compact_only:
+        compact(load_previous_output()[1])
+    else:
+        run(workers=args.workers, requests_per_min=args.rpm, tokens_per_min=args.tpm, fsync_every=args.fsync_every)
@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import get_args
+from neo4j import GraphDatabase
+from dotenv import load_dotenv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.graph_retriever import (
+    COUNTER_PICKS_QUERY, COUNTER_PICKS_BATCH_QUERY, MECHANIC_HOLDERS_QUERY, ARCHETYPE_COUNTERS_QUERY,
+)
+from backend.schemas import StrategicMechanic, ValidArchetype, ValidPosition
+
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'query_budgets.json')
+
+# Every lane plus "no lane filter"
+LANES = [None] + list(get_args(ValidPosition))
+
+# Headroom written by --update, so normal graph churn doesn't trip the check
+HEADROOM = 1.2
+
+def param_sets(champion_names):
+    """Representative parameters for every GraphRetriever query."""
+    return {
+        "counter_picks": (COUNTER_PICKS_QUERY, [
+            {"enemyName": name, "myLane": lane, "limit": 3} for name in champion_names for lane in LANES
+        ]),
+        "counter_picks_batch": (COUNTER_PICKS_BATCH_QUERY, [
+            {"pairs": [{"slot": i, "enemyName": name, "myLane": lane} for i, name in enumerate(champion_names)], "limit": 3}
+            for lane in LANES
+        ]),
+        "mechanic_holders": (MECHANIC_HOLDERS_QUERY, [
+            {"mechName": mech, "myLane": lane} for mech in get_args(StrategicMechanic) for lane in LANES
+        ]),
+        "archetype_counters": (ARCHETYPE_COUNTERS_QUERY, [
+            {"archName": arch, "myLane": lane} for arch in get_args(ValidArchetype) for lane in LANES
+        ]),
+    }
+
+def walk_plan(plan):
+    """Returns (total db hits, rows produced by all operators, operator names) for a PROFILE tree."""
+    db_hits = plan.get('dbHits', 0)
+    rows = plan.get('rows', 0)
+    # Operator names carry a runtime suffix, e.g. "Expand(All)@neo4j"
+    operators = {plan.get('operatorType', '?').split('@')[0]}
+    for child in plan.get('children', []):
+        child_hits, child_rows, child_ops = walk_plan(child)
+        db_hits += child_hits
+        rows += child_rows
+        operators |= child_ops
+    return db_hits, rows, operators
+
+class QueryProfiler:
+    def __init__(self, uri, auth):
+        self.driver = GraphDatabase.driver(uri, auth=auth)
+
+    def close(self):
+        self.driver.close()
+
+    def champion_names(self):
+        with self.driver.session() as session:
+            return [record["name"] for record in session.run("MATCH (c:Champion) RETURN c.name AS name ORDER BY name")]
+
+    def profile(self, query, params):
+        with self.driver.session() as session:
+            result = session.run("PROFILE " + query, parameters=params)
+            returned = len(list(result))
+            summary = result.consume()
+        db_hits, rows, operators = walk_plan(summary.profile or {})
+        return {"db_hits": db_hits, "rows": rows, "returned": returned, "operators": operators}
+
+    def profile_query(self, query, params_list):
+        start = time.perf_counter()
+        runs = [(params, self.profile(query, params)) for params in params_list]
+        hits = sorted(run["db_hits"] for _, run in runs)
+        worst_params, _ = max(runs, key=lambda item: item[1]["db_hits"])
+        operators = set().union(*(run["operators"] for _, run in runs))
+        return {
+            "runs": len(runs),
+            "db_hits_max": hits[-1],
+            "db_hits_p50": hits[len(hits) // 2],
+            "db_hits_total": sum(hits),
+            "rows_max": max(run["rows"] for _, run in runs),
+            "operators": sorted(operators),
+            # Batch params are too long to be useful in a report
+            "worst_params": {k: v for k, v in worst_params.items() if k != "pairs"},
+            "seconds": round(time.perf_counter() - start, 2),
+        }
+
+def check_budgets(report, budgets, require=False):
+    """Returns (failures, warnings) comparing a profile report with the stored budgets.
+
+    With `require`, a query without a recorded budget is a failure rather than a warning.
+    """
+    failures, warnings = [], []
+    for name, stats in report.items():
+        budget = budgets.get(name)
+        if budget is None:
+            (failures if require else warnings).append(f"{name}: no budget recorded (run with --update)")
+            continue
+        for key in ("db_hits_max", "db_hits_total", "rows_max"):
+            if stats[key] > budget[key]:
+                failures.append(f"{name}: {key} {stats[key]} > budget {budget[key]}")
+        new_ops = sorted(set(stats["operators"]) - set(budget.get("operators", [])))
+        if new_ops:
+            warnings.append(f"{name}: new plan operators {new_ops}")
+    return failures, warnings
+
+def budgets_from(report):
+    return {
+        name: {
+            "db_hits_max": int(stats["db_hits_max"] * HEADROOM),
+            "db_hits_total": int(stats["db_hits_total"] * HEADROOM),
+            "rows_max": int(stats["rows_max"] * HEADROOM),
+            "operators": stats["operators"],
+        }
+        for name, stats in report.items()
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PROFILE every GraphRetriever query and check db-hit budgets.")
+    parser.add_argument("--query", action="append", help="Only profile this query (repeatable)")
+    parser.add_argument("--budgets", default=BUDGET_FILE)
+    parser.add_argument("--update", action="store_true", help="Rewrite the budgets from this run (with headroom)")
+    parser.add_argument("--require-budgets", action="store_true", help="Fail when a profiled query has no recorded budget (CI)")
+    parser.add_argument("--output", help="Write the full report JSON here")
+    args = parser.parse_args()
+
+    load_dotenv()
+    profiler = QueryProfiler(
+        os.getenv("NEO4J_URI", "bolt://neo4j:7687"),
+        (os.getenv("NEO4J_USER", "neo4j"), os.getenv("NEO4J_PASSWORD")),
+    )
+    try:
+        names = profiler.champion_names()
+        print(f"Profiling against {len(names)} champions...")
+        report = {}
+        for name, (query, params_list) in param_sets(names).items():
+            if args.query and name not in args.query:
+                continue
+            report[name] = profiler.profile_query(query, params_list)
+            stats = report[name]
+            print(f"{name:<20} runs {stats['runs']:>5}  db hits max {stats['db_hits_max']:>8}  p50 {stats['db_hits_p50']:>8}  "
+                  f"total {stats['db_hits_total']:>10}  rows max {stats['rows_max']:>8}  ({stats['seconds']}s)")
+            print(f"{'':<20} operators: {', '.join(stats['operators'])}")
+    finally:
+        profiler.close()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update:
+        budgets = {}
+        if os.path.exists(args.budgets):
+            with open(args.budgets, 'r', encoding='utf-8') as f:
+                budgets = json.load(f)
+        budgets.update(budgets_from(report))
+        with open(args.budgets, 'w', encoding='utf-8') as f:
+            json.dump(budgets, f, indent=2)
+        print(f"Budgets written to {args.budgets}")
+        sys.exit(0)
+
+    budgets = {}
+    if os.path.exists(args.budgets):
+        with open(args.budgets, 'r', encoding='utf-8') as f:
+            budgets = json.load(f)
+    failures, warnings = check_budgets(report, budgets, require=args.require_budgets)
+    for warning in warnings:
+        print(f"⚠️ {warning}")
+    if failures:
+        print("❌ Over budget or unbudgeted:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("✅ All profiled queries within budget")
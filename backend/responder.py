@@ -1,51 +1,231 @@
 import json
 import os
-from neo4j import GraphDatabase
 from dotenv import load_dotenv
-from google import genai
 import time
-from google.genai.errors import ServerError
 from backend import user_intent
+from backend.cache import ResponseCache
+from backend.context_encoder import approx_tokens, encode_context
+from backend.knowledge_base import current_kb_version
+from backend.event_loop import run_sync, iterate_sync
+from backend.llm_gateway import LLMUnavailable, get_client, get_gateway
+from backend.template_responder import TemplateResponder, TemplateResponse, fallback_deadline, responder_mode
+from backend.tracing import get_tracer
 
 load_dotenv()
 
+class ResponseStream:
+    """Yields answer chunks as they arrive and records time-to-first-token and total time.
+
+    Iterate with `async for` on an event loop, or with a plain `for` from sync code.
+    """
+    def __init__(self, chunks, on_complete=None, trace_id=None, cached=False, prompt_stats=None):
+        self._chunks = chunks
+        self._on_complete = on_complete
+        self.trace_id = trace_id
+        self.cached = cached
+        # Prompt size: the encoder's estimate up front, Gemini's prompt_tokens once the stream ends
+        self.prompt_stats = prompt_stats if prompt_stats is not None else {}
+        self.started = time.perf_counter()
+        self.text = ""
+        self.ttft = None
+        self.total = None
+
+    async def __aiter__(self):
+        parts = []
+        async for chunk in self._chunks:
+            if not chunk:
+                continue
+            if self.ttft is None:
+                self.ttft = time.perf_counter() - self.started
+            parts.append(chunk)
+            yield chunk
+
+        self.text = "".join(parts)
+        self.total = time.perf_counter() - self.started
+        # A template stand-in must not be cached as the LLM's answer
+        if self._on_complete is not None and self.text and not self.prompt_stats.get("fallback"):
+            self._on_complete(self.text)
+        # The stream is consumed across several tasks, so it is reported as one finished span
+        get_tracer().record(
+            "respond.stream", self.total, trace_id=self.trace_id, status="ok" if self.text else "error",
+            ttft_ms=self.timings()["ttft_ms"], chars=len(self.text), cached=self.cached, **self.prompt_stats,
+        )
+
+    def __iter__(self):
+        return iterate_sync(self)
+
+    def timings(self):
+        return {
+            "ttft_ms": round(self.ttft * 1000, 1) if self.ttft is not None else None,
+            "total_ms": round(self.total * 1000, 1) if self.total is not None else None,
+        }
+
+async def _single_chunk(text):
+    yield text
+
 class Responder:
-    def __init__(self):
-        self.model = genai.Client()
+    def __init__(self, use_cache=True, mode=None):
+        self.gateway = get_gateway()
+        # Identical (intent, context, graph rows) share one generation until the KB changes
+        self.response_cache = ResponseCache(current_kb_version()) if use_cache else None
+        # llm | template | auto; every call can override it
+        self.mode = mode or responder_mode()
+        self.templates = TemplateResponder()
+        self.metrics = {"llm": 0, "template": 0, "fallback": 0}
         self.system_prompt = """
             You are a League of Legends coach.
             TASK: Use ONLY the following information to advise the user. Adopt a professional and coaching tone.
             IF the user query is an irrelevant topic, simply let the user know you are unable to proceed with his request.
-            IF Champion Information is an empty list, inform the user that what his requesting for does not exist, based on the information available.
+            IF Champion Information has no rows, inform the user that what his requesting for does not exist, based on the information available.
             The original user query has been has been distilled to its intention. However, the original query is still attached for additional context.
+            Champion Information is a table, one row per champion. Reasoning/Risks cells reference the numbered Reasons above it; "Zed:R1" means R1 applies against Zed.
             Do not include an intro, but do give a summary if helpful.
             Note: Archetype refers to the subclassses that Champions are divided into, e.g. Warden, Diver, Artillery
             """
         
-    def generate_response(self, graph_data, context, user_query):
-        max_retries = 10
-        base_delay = 1
-        
-        for attempt in range(max_retries):
-            try:
-                response = self.model.models.generate_content(
+    @property
+    def model(self):
+        return get_client()
+
+    def generate_response(self, graph_data, context, user_query, intent=None, trace_id=None, mode=None):
+        return run_sync(self.agenerate_response(graph_data, context, user_query, intent, trace_id, mode))
+
+    async def agenerate_response(self, graph_data, context, user_query, intent=None, trace_id=None, mode=None):
+        mode = mode or self.mode
+        with get_tracer().span("respond", trace_id=trace_id, mode=mode) as span:
+            if mode == "template":
+                self.metrics["template"] += 1
+                response = TemplateResponse(self.templates.render(intent, graph_data, context))
+                span.set(chars=len(response.text))
+                return response
+
+            self.metrics["llm"] += 1
+            contents, prompt_stats = self._prompt(graph_data, context, user_query)
+            # Auto mode gives Gemini a tighter deadline; slow calls also count towards opening the circuit
+            deadline = fallback_deadline() if mode == "auto" else None
+            if self.response_cache is None:
+                response = await self._generate(contents, prompt_stats, deadline)
+            else:
+                key = self.response_cache.key(intent, context, graph_data)
+                response = await self.response_cache.get_or_generate(key, lambda: self._generate(contents, prompt_stats, deadline))
+            if response is None and mode == "auto":
+                self.metrics["fallback"] += 1
+                prompt_stats["fallback"] = True
+                response = TemplateResponse(self.templates.render(intent, graph_data, context))
+            span.set(chars=len(response.text or "") if response is not None else 0, **prompt_stats)
+            return response
+
+    def stream_response(self, graph_data, context, user_query, intent=None, trace_id=None, mode=None):
+        """Streaming variant of generate_response; iterate the result for text chunks."""
+        mode = mode or self.mode
+        if mode == "template":
+            return self.template_stream(graph_data, context, intent, trace_id)
+        key = self.response_cache.key(intent, context, graph_data) if self.response_cache is not None else None
+        contents, prompt_stats = self._prompt(graph_data, context, user_query)
+        fallback = (lambda: self.templates.render(intent, graph_data, context)) if mode == "auto" else None
+        return self.stream_contents(contents, self._config(), key, trace_id, prompt_stats, fallback)
+
+    def template_stream(self, graph_data, context, intent=None, trace_id=None):
+        """The template answer as a one-chunk ResponseStream, so callers handle both modes alike."""
+        self.metrics["template"] += 1
+        return ResponseStream(_single_chunk(self.templates.render(intent, graph_data, context)), trace_id=trace_id, prompt_stats={"template": True})
+
+    def stream_contents(self, contents, config, cache_key=None, trace_id=None, prompt_stats=None, fallback=None):
+        """Streams an answer for prepared contents (e.g. a tool-calling session), cached under cache_key.
+
+        `fallback` (auto mode) returns the template answer, streamed instead when Gemini fails or
+        misses the fallback deadline before its first token.
+        """
+        prompt_stats = dict(prompt_stats or {})
+        if cache_key is None:
+            self.metrics["llm"] += 1
+            return ResponseStream(self._stream_chunks(contents, config, trace_id, prompt_stats, fallback), trace_id=trace_id, prompt_stats=prompt_stats)
+
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return ResponseStream(_single_chunk(cached), trace_id=trace_id, cached=True)
+        self.metrics["llm"] += 1
+        return ResponseStream(
+            self._stream_chunks(contents, config, trace_id, prompt_stats, fallback),
+            on_complete=lambda text: self.response_cache.set(cache_key, text),
+            trace_id=trace_id,
+            prompt_stats=prompt_stats,
+        )
+
+    def _config(self):
+        # The instructions go in system_instruction rather than being pasted into every prompt
+        return {"system_instruction": self.system_prompt, "temperature": 0.2}
+
+    def _prompt(self, graph_data, context, user_query):
+        """Returns (contents, prompt stats) with the graph rows in the encoder's compact, budgeted form."""
+        encoded = encode_context(graph_data)
+        contents = f"Original User Query: {user_query}\n\nContext: {context}\n\nChampion Information:\n{encoded.text}"
+        return contents, {"prompt_tokens_est": approx_tokens(self.system_prompt) + approx_tokens(contents), **encoded.stats()}
+
+    async def _stream_chunks(self, contents, config, trace_id=None, prompt_stats=None, fallback=None):
+        answered = False
+        try:
+            # The request is only sent on the first iteration, so the gateway covers opening the
+            # stream up to the first chunk; once text is flowing we can't restart the answer
+            async def open_stream():
+                stream = await self.model.aio.models.generate_content_stream(
                     model="gemini-2.5-flash",
-                    contents=f"{self.system_prompt}\n\nOriginal User Query:{user_query}\n\nContext:{context}\n\nChampion Information: {graph_data}",
-                    config={
-                        "temperature": 0.2
-                    }
+                    contents=contents,
+                    config=config,
                 )
-                return response
-                
-            except ServerError as e:
-                #print(f"Server overloaded (Attempt {attempt + 1}/{max_retries})...")
-                sleep_time = base_delay * (2 ** attempt) 
-                #print(f"Retrying in {sleep_time} seconds...")
-                time.sleep(sleep_time)
-                
-            except Exception as e:
-                print(f"Critical API Error: {e}")
-                break
-                
-        print("Failed to get response after multiple attempts.")
+                return await anext(stream, None), stream
+
+            # Scoped to the gateway call: a generator must not hold a context var across yields
+            with get_tracer().trace(trace_id):
+                first, stream = await self.gateway.acall(
+                    open_stream, deadline=fallback_deadline() if fallback is not None else None, name="respond_stream"
+                )
+            if first is not None and first.text:
+                answered = True
+                yield first.text
+            last = first
+            async for chunk in stream:
+                last = chunk
+                if chunk.text:
+                    answered = True
+                    yield chunk.text
+            # Usage metadata rides on the final chunk
+            if prompt_stats is not None and last is not None and last.usage_metadata is not None:
+                prompt_stats["prompt_tokens"] = last.usage_metadata.prompt_token_count
+
+        except LLMUnavailable as e:
+            print(f"Failed to get response: {e}")
+        except Exception as e:
+            print(f"Critical API Error: {e}")
+
+        # Once text has streamed the answer can't be swapped; before that the template stands in
+        if fallback is not None and not answered:
+            print("⚠️ Answering from the template instead")
+            self.metrics["fallback"] += 1
+            if prompt_stats is not None:
+                prompt_stats["fallback"] = True
+            yield fallback()
+
+    async def _generate(self, contents, prompt_stats=None, deadline=None):
+        try:
+            response = await self.gateway.acall(
+                lambda: self.model.aio.models.generate_content(
+                    model="gemini-2.5-flash",
+                    contents=contents,
+                    config=self._config(),
+                ),
+                deadline=deadline,
+                name="respond",
+            )
+            if prompt_stats is not None and response.usage_metadata is not None:
+                prompt_stats["prompt_tokens"] = response.usage_metadata.prompt_token_count
+            return response
+
+        except LLMUnavailable as e:
+            print(f"Failed to get response: {e}")
+        except Exception as e:
+            print(f"Critical API Error: {e}")
         return None
+
+    def stats(self):
+        return {"mode": self.mode, **self.metrics}
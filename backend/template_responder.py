@@ -0,0 +1,121 @@
+import os
+import re
+from dataclasses import dataclass
+from backend import user_intent
+
+MODES = ("llm", "template", "auto")
+
+# "Vulnerable to Grievous Wounds due to High Sustain: <mechanic details>", optionally prefixed "vs Zed: "
+WEAKNESS = re.compile(r"^(?:vs (?P<enemy>[^:]+): )?Vulnerable to (?P<counter>.+?) due to (?P<trait>[^:]+)(?::.*)?$", re.S)
+ENEMY_PREFIX = re.compile(r"^vs ([^:]+): (.*)$", re.S)
+
+def responder_mode():
+    """RESPONDER_MODE: 'llm' (Gemini writes every answer), 'template' (never calls Gemini) or 'auto'
+    (Gemini, with the template answer when it is unavailable, its circuit is open or it is too slow)."""
+    mode = os.getenv("RESPONDER_MODE", "llm").lower()
+    return mode if mode in MODES else "llm"
+
+def fallback_deadline():
+    """Seconds auto mode waits for Gemini's first token before answering from the template."""
+    return float(os.getenv("TEMPLATE_FALLBACK_SECONDS", "5"))
+
+@dataclass
+class TemplateResponse:
+    # Stands in for the Gemini response object, like CachedResponse
+    text: str
+
+def _first_sentence(text):
+    match = re.match(r"(.+?[.!?])(\s|$)", text.strip(), re.S)
+    return match.group(1) if match else text.strip()
+
+def _pro(reason, enemy):
+    """One pick's edge, e.g. 'Grievous Wounds punishes Aatrox's High Sustain'."""
+    match = WEAKNESS.match(reason)
+    if match:
+        return f"{match['counter']} punishes {match['enemy'] or enemy}'s {match['trait']}"
+    prefixed = ENEMY_PREFIX.match(reason)
+    return f"vs {prefixed.group(1)}: {prefixed.group(2)}" if prefixed else reason
+
+def _risk(reason, enemy):
+    """One way the enemy punishes the pick, e.g. 'Aatrox's Anti-Dash catches your High Mobility'."""
+    match = WEAKNESS.match(reason)
+    if match:
+        return f"{match['enemy'] or enemy}'s {match['counter']} catches your {match['trait']}"
+    prefixed = ENEMY_PREFIX.match(reason)
+    return f"{prefixed.group(1)}: {prefixed.group(2)}" if prefixed else reason
+
+def _unique(items):
+    return list(dict.fromkeys(items))
+
+class TemplateResponder:
+    """Writes a coaching-style answer from the graph rows with per-intent templates.
+
+    Deterministic and local: no network, no tokens, well under a millisecond. Used on request
+    (RESPONDER_MODE=template) and as the Responder's fallback when Gemini can't answer in time.
+    """
+    def render(self, intent, graph_data, context):
+        if not isinstance(graph_data, list) or not graph_data:
+            return f"Nothing in the knowledge base matches that ({context}). Try another lane or champion."
+        match intent:
+            case user_intent.CounterPick():
+                return self.counter_pick(intent, graph_data)
+            case user_intent.MechanicSearch():
+                return self.mechanic_holders(intent, graph_data)
+            case user_intent.ArchetypeCounters():
+                return self.archetype_counters(intent, graph_data)
+            case user_intent.TeamDraft():
+                return self.team_draft(intent, graph_data)
+        # Tool sessions and unknown shapes: list the champions with their first reason
+        return "\n".join([f"{context}:"] + [f"- **{row.get('Champion')}**: {(row.get('Reasoning') or ['-'])[0]}" for row in graph_data])
+
+    def counter_pick(self, intent, rows):
+        enemy = intent.enemy_champion
+        lines = [f"Best picks into **{enemy}** ({intent.my_position or 'any lane'}):"]
+        for row in rows:
+            lines.append(f"- **{row['Champion']}** (score {row.get('Score', 0)})")
+            pros = _unique(_pro(reason, enemy) for reason in row.get('Reasoning') or [])
+            risks = _unique(_risk(reason, enemy) for reason in row.get('Risks') or [])
+            if pros:
+                lines.append(f"  - Why it works: {'; '.join(pros)}.")
+            if risks:
+                lines.append(f"  - Watch out: {'; '.join(risks)}.")
+            if not pros and not risks:
+                lines.append("  - Wins the matchup on raw archetype strength.")
+        lines.append(f"\nSummary: **{rows[0]['Champion']}** is the safest answer to {enemy}" +
+                     (f", with {rows[1]['Champion']} as a backup." if len(rows) > 1 else "."))
+        return "\n".join(lines)
+
+    def mechanic_holders(self, intent, rows):
+        lines = [f"Champions with **{intent.mechanic_concept}** ({intent.my_position or 'any lane'}):"]
+        for row in rows:
+            details = row.get('Reasoning') or []
+            lines.append(f"- **{row['Champion']}**" + (f": {_first_sentence(details[0])}" if details else ""))
+        return "\n".join(lines)
+
+    def archetype_counters(self, intent, rows):
+        # Rows repeat the class-level reason for every champion, so group by class
+        groups = {}
+        for row in rows:
+            reason = (row.get('Reasoning') or [""])[0]
+            groups.setdefault((row.get('Class'), reason), []).append(row['Champion'])
+        lines = [f"Into **{intent.enemy_archetype}s** ({intent.my_position or 'any lane'}):"]
+        for (archetype, reason), champions in groups.items():
+            lines.append(f"- **{archetype}** picks" + (f" ({reason.rstrip('.')})" if reason else "") + f": {', '.join(champions)}")
+        return "\n".join(lines)
+
+    def team_draft(self, intent, rows):
+        enemies = ', '.join(intent.enemy_champions)
+        by_role = {}
+        for row in rows:
+            by_role.setdefault(row.get('Role') or 'Any', []).append(row)
+        lines = [f"Draft into **{enemies}**:"]
+        for role, picks in by_role.items():
+            lines.append(f"- **{role}**: " + ", ".join(f"{row['Champion']} (score {row.get('Score', 0)})" for row in picks))
+            best = picks[0]
+            pros = _unique(_pro(reason, None) for reason in best.get('Reasoning') or [])
+            risks = _unique(_risk(reason, None) for reason in best.get('Risks') or [])
+            if pros:
+                lines.append(f"  - {best['Champion']}: {'; '.join(pros)}.")
+            if risks:
+                lines.append(f"  - Watch out: {'; '.join(risks)}.")
+        return "\n".join(lines)
@@ -0,0 +1,244 @@
+import os
+import time
+from typing import get_args
+from backend import user_intent
+from backend.context_encoder import default_budget, encode_context
+from backend.event_loop import maybe_await, run_sync
+from backend.graph_retriever import RoutedQuery
+from backend.llm_gateway import LLMUnavailable
+from backend.schemas import StrategicMechanic, ValidArchetype, ValidPosition
+from backend.tracing import get_tracer
+
+def pipeline_mode():
+    """PIPELINE_MODE: 'classic' (classify, then respond) or 'tools' (one tool-calling session)."""
+    return os.getenv("PIPELINE_MODE", "classic").lower()
+
+def _lane():
+    return {"type": "STRING", "enum": list(get_args(ValidPosition)), "description": "The user's lane, only if they stated one"}
+
+# Function declarations for the three graph lookups, in the Gemini schema format
+TOOLS = [{"function_declarations": [
+    {
+        "name": "get_counter_picks",
+        "description": "Best counter picks against one enemy champion, with the reasons and the risks of each pick.",
+        "parameters": {
+            "type": "OBJECT",
+            "properties": {
+                "enemy_champion": {"type": "STRING", "description": "The enemy champion, in Proper Casing"},
+                "my_position": _lane(),
+            },
+            "required": ["enemy_champion"],
+        },
+    },
+    {
+        "name": "find_mechanic_holders",
+        "description": "Champions that have a strategic mechanic (e.g. anti-heal is Grievous Wounds, windwall is Projectile Block).",
+        "parameters": {
+            "type": "OBJECT",
+            "properties": {
+                "mechanic": {"type": "STRING", "enum": list(get_args(StrategicMechanic))},
+                "my_position": _lane(),
+            },
+            "required": ["mechanic"],
+        },
+    },
+    {
+        "name": "get_archetype_counters",
+        "description": "Champions whose archetype counters an enemy archetype.",
+        "parameters": {
+            "type": "OBJECT",
+            "properties": {
+                "archetype": {"type": "STRING", "enum": list(get_args(ValidArchetype))},
+                "my_position": _lane(),
+            },
+            "required": ["archetype"],
+        },
+    },
+]}]
+
+SYSTEM_PROMPT = """
+    You are a League of Legends coach with access to a champion knowledge graph.
+    For any question about counters, mechanics or archetypes, call the matching tool first and
+    answer ONLY from what the tool returns. Adopt a professional and coaching tone.
+    Do not include an intro, but do give a summary if helpful.
+    If the tool's table has no rows, tell the user that nothing matches, based on the information available.
+    If the query is about skins, lore, stats or anything else off-topic, say briefly that you can't help with it and call no tool.
+    Tool tables have one row per champion; Reasoning/Risks cells reference the numbered Reasons above the table ("Zed:R1" means R1 applies against Zed).
+    Note: Archetype refers to the subclasses that Champions are divided into, e.g. Warden, Diver, Artillery
+    """
+
+class ToolAgent:
+    """Answers a query in one tool-calling session instead of classify -> graph -> respond.
+
+    The model picks a graph lookup as a function call, the lookup runs locally, and the
+    answer streams back in the same session. When the intent cache or the local parser
+    already knows the intent, the lookup is prefetched and only the answer call is made.
+    """
+    def __init__(self, switchboard, responder, max_calls=5):
+        self.switchboard = switchboard
+        self.responder = responder
+        self.gateway = switchboard.gateway
+        self.max_calls = max_calls
+        self.metrics = {"queries": 0, "prefetched": 0, "llm_calls": 0, "tool_calls": 0, "fallbacks": 0}
+
+    def answer(self, user_query, graph_retriever, trace_id=None, mode=None):
+        return run_sync(self.aanswer(user_query, graph_retriever, trace_id, mode))
+
+    async def aanswer(self, user_query, graph_retriever, trace_id=None, mode=None):
+        """Returns (RoutedQuery, ResponseStream or None), like route() followed by stream_response().
+
+        `mode` is the Responder mode; template answers skip the session and route classically.
+        """
+        self.metrics["queries"] += 1
+        mode = mode or self.responder.mode
+        sb = self.switchboard
+        if mode == "template":
+            routed = await sb.aroute(user_query, graph_retriever, trace_id)
+            if routed.graph_data == "NA" or routed.suggestions:
+                return routed, None
+            return routed, self.responder.template_stream(routed.graph_data, routed.context, routed.intent, routed.trace_id)
+
+        with get_tracer().trace(trace_id) as trace_id:
+            intent = await sb.aclassify_local(user_query)
+        if intent is not None:
+            # No planning call needed: route locally, then one call writes the answer
+            self.metrics["prefetched"] += 1
+            routed = await sb.aroute(user_query, graph_retriever, trace_id, intent=intent)
+            if routed.graph_data == "NA" or routed.suggestions:
+                return routed, None
+            self.metrics["llm_calls"] += 1
+            stream = self.responder.stream_response(routed.graph_data, routed.context, user_query, intent=routed.intent, trace_id=routed.trace_id, mode=mode)
+            return routed, stream
+
+        try:
+            with get_tracer().span("agent", trace_id=trace_id) as span:
+                routed, contents = await self._plan(user_query, getattr(graph_retriever, "aio", graph_retriever))
+                routed.trace_id = span.trace_id
+                span.set(intent=getattr(routed.intent, "intent_type", None))
+        except LLMUnavailable as e:
+            # No planning call: route like the classic pipeline, answering from the template in auto mode
+            print(f"Tool session unavailable, routing classically: {e}")
+            self.metrics["fallbacks"] += 1
+            routed = await sb.aroute(user_query, graph_retriever, trace_id)
+            if routed.graph_data == "NA" or routed.suggestions:
+                return routed, None
+            if mode == "auto":
+                return routed, self.responder.template_stream(routed.graph_data, routed.context, routed.intent, routed.trace_id)
+            return routed, self.responder.stream_response(routed.graph_data, routed.context, user_query, intent=routed.intent, trace_id=routed.trace_id, mode=mode)
+        if contents is None:
+            return routed, None
+
+        # Same session: the model sees its own function calls and their results, and may not call again
+        self.metrics["llm_calls"] += 1
+        config = {
+            "system_instruction": SYSTEM_PROMPT,
+            "tools": TOOLS,
+            "tool_config": {"function_calling_config": {"mode": "NONE"}},
+            "temperature": 0.2,
+        }
+        cache = self.responder.response_cache
+        key = cache.key(routed.intent, routed.context, routed.graph_data) if cache is not None else None
+        fallback = None
+        if mode == "auto":
+            # Several lookups (a draft) have no single intent template; the generic one lists the picks
+            intent = routed.intent if len(contents[-1]["parts"]) == 1 else None
+            fallback = lambda: self.responder.templates.render(intent, routed.graph_data, routed.context)
+        return routed, self.responder.stream_contents(contents, config, key, routed.trace_id, fallback=fallback)
+
+    async def _plan(self, user_query, graph_retriever):
+        """First turn: lets the model choose lookups, runs them. Returns (RoutedQuery, contents for the answer turn or None).
+
+        Raises LLMUnavailable when Gemini can't be reached, so the caller can route without it.
+        """
+        started = time.perf_counter()
+        contents = [{"role": "user", "parts": [{"text": user_query}]}]
+        try:
+            self.metrics["llm_calls"] += 1
+            response = await self.gateway.acall(
+                lambda: self.switchboard.model.aio.models.generate_content(
+                    model="gemini-2.5-flash",
+                    contents=contents,
+                    config={
+                        "system_instruction": SYSTEM_PROMPT,
+                        "tools": TOOLS,
+                        "automatic_function_calling": {"disable": True},
+                        "temperature": 0.2,
+                    },
+                ),
+                name="agent_plan",
+            )
+        except LLMUnavailable:
+            raise
+        except Exception as e:
+            print(f"Critical API Error: {e}")
+            return RoutedQuery(None, "NA", "NA", {"classify_ms": round((time.perf_counter() - started) * 1000, 2)}), None
+        planned = time.perf_counter()
+        timings = {"classify_ms": round((planned - started) * 1000, 2)}
+
+        calls = (response.function_calls or [])[:self.max_calls]
+        if not calls:
+            reason = (response.text or "No graph lookup for this query").strip()
+            print(f"⚠️ Unknown Intent: {reason}")
+            return RoutedQuery(user_intent.UnknownIntent(intent_type="unknown", reason=reason), "NA", "NA", timings), None
+
+        intents, suggestions = [], {}
+        for call in calls:
+            try:
+                intent = self.to_intent(call.name, call.args or {})
+            except (KeyError, ValueError) as e:
+                print(f"⚠️ Unusable tool call {call.name}: {e}")
+                return RoutedQuery(None, "NA", "NA", timings), None
+            intent, unresolved = self.switchboard.resolve_names(intent)
+            intents.append(intent)
+            suggestions.update(unresolved)
+        if suggestions:
+            print(f"⚠️ Unresolved champion names: {suggestions}")
+            timings["graph_ms"] = 0.0
+            return RoutedQuery(intents[0], [], "Unknown champion", timings, suggestions=suggestions), None
+
+        graph_data, contexts, responses = [], [], []
+        # The calls share one context budget; each result is sent as an encoded table, not raw rows
+        budget = default_budget() // len(calls)
+        with get_tracer().span("graph", intent=intents[0].intent_type, calls=len(calls)):
+            for call, intent in zip(calls, intents):
+                rows, context = await self.run_tool(intent, graph_retriever)
+                self.metrics["tool_calls"] += 1
+                graph_data.extend(rows)
+                contexts.append(context)
+                responses.append({"function_response": {"name": call.name, "response": {"context": context, "table": encode_context(rows, budget).text}}})
+        timings["graph_ms"] = round((time.perf_counter() - planned) * 1000, 2)
+
+        contents.append(response.candidates[0].content)
+        contents.append({"role": "user", "parts": responses})
+        return RoutedQuery(intents[0], graph_data, "; ".join(contexts), timings), contents
+
+    @staticmethod
+    def to_intent(name, args):
+        """The Router intent equivalent to a tool call, so caching, name resolution and the UI work unchanged."""
+        position = args.get("my_position") or None
+        match name:
+            case "get_counter_picks":
+                return user_intent.CounterPick(intent_type="counter_pick", enemy_champion=args["enemy_champion"], my_position=position)
+            case "find_mechanic_holders":
+                return user_intent.MechanicSearch(intent_type="mechanic_search", mechanic_concept=args["mechanic"], my_position=position)
+            case "get_archetype_counters":
+                return user_intent.ArchetypeCounters(intent_type="archetype_counter", enemy_archetype=args["archetype"], my_position=position)
+        raise ValueError(f"Unknown tool {name}")
+
+    @staticmethod
+    async def run_tool(intent, graph_retriever):
+        """Runs one lookup locally; returns (rows, context line) as Switchboard routing would."""
+        lane = intent.my_position or 'Any Lane'
+        match intent:
+            case user_intent.CounterPick():
+                rows = await maybe_await(graph_retriever.get_counter_picks(enemy_name=intent.enemy_champion, position=intent.my_position, limit=3))
+                return rows, f"Countering {intent.enemy_champion} in {lane}"
+            case user_intent.MechanicSearch():
+                rows = await maybe_await(graph_retriever.find_mechanic_holders(mechanic_name=intent.mechanic_concept, position=intent.my_position))
+                return rows, f"Champions with {intent.mechanic_concept} in {lane}"
+            case user_intent.ArchetypeCounters():
+                rows = await maybe_await(graph_retriever.get_archetype_counters(target_archetype=intent.enemy_archetype, position=intent.my_position))
+                return rows, f"Champions that counter {intent.enemy_archetype}s in {lane}"
+
+    def stats(self):
+        return dict(self.metrics)
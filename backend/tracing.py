@@ -0,0 +1,216 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Prometheus histogram buckets, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_trace_id = contextvars.ContextVar("trace_id", default=None)
+_span_id = contextvars.ContextVar("span_id", default=None)
+
+def new_id():
+    return uuid.uuid4().hex[:16]
+
+def current_trace_id():
+    return _trace_id.get()
+
+class Span:
+    def __init__(self, name, trace_id, parent_id, attrs):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = new_id()
+        self.parent_id = parent_id
+        self.attrs = dict(attrs)
+        self.status = "ok"
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.started_at, 6),
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "status": self.status,
+            "attrs": self.attrs,
+        }
+
+class Tracer:
+    """Span-style timings for each pipeline stage.
+
+    Finished spans are appended to a JSONL log, folded into Prometheus histograms and kept
+    per trace for the last few traces (the Streamlit debug panel reads those).
+    Spans opened with span() nest through contextvars, so they must open and close in the
+    same task; stages that outlive a task (answer streams) are reported with record().
+    """
+    def __init__(self, log_path=None, keep_traces=64):
+        self.log_path = log_path
+        self._log = None
+        self._lock = threading.Lock()
+        self._traces = OrderedDict()  # trace_id -> [span dict]
+        self.keep_traces = keep_traces
+        self._histograms = {}  # name -> [bucket counts..., +Inf count, sum]
+        self._errors = {}
+        self._rows = {}
+        self._gauges = {}  # source -> callable returning [(metric, help, value)], read at scrape time
+
+    @contextmanager
+    def trace(self, trace_id=None):
+        """Makes trace_id (or the current trace, or a new one) current for the enclosed spans."""
+        trace_id = trace_id or _trace_id.get() or new_id()
+        token = _trace_id.set(trace_id)
+        try:
+            yield trace_id
+        finally:
+            _trace_id.reset(token)
+
+    @contextmanager
+    def span(self, name, trace_id=None, **attrs):
+        span = Span(name, trace_id or _trace_id.get() or new_id(), _span_id.get(), attrs)
+        trace_token = _trace_id.set(span.trace_id)
+        span_token = _span_id.set(span.span_id)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            _span_id.reset(span_token)
+            _trace_id.reset(trace_token)
+            span.duration = time.perf_counter() - span._start
+            self._finish(span)
+
+    def record(self, name, duration, trace_id=None, status="ok", **attrs):
+        """Reports a stage timed by the caller, e.g. a response stream that spans several tasks."""
+        span = Span(name, trace_id or _trace_id.get() or new_id(), None, attrs)
+        span.started_at -= duration
+        span.duration = duration
+        span.status = status
+        self._finish(span)
+
+    def _finish(self, span):
+        record = span.to_dict()
+        with self._lock:
+            spans = self._traces.setdefault(span.trace_id, [])
+            spans.append(record)
+            self._traces.move_to_end(span.trace_id)
+            while len(self._traces) > self.keep_traces:
+                self._traces.popitem(last=False)
+
+            histogram = self._histograms.setdefault(span.name, [0] * (len(BUCKETS) + 1) + [0.0])
+            for i, bound in enumerate(BUCKETS):
+                if span.duration <= bound:
+                    histogram[i] += 1
+            histogram[len(BUCKETS)] += 1
+            histogram[-1] += span.duration
+            if span.status != "ok":
+                self._errors[span.name] = self._errors.get(span.name, 0) + 1
+            if isinstance(span.attrs.get("rows"), int):
+                self._rows[span.name] = self._rows.get(span.name, 0) + span.attrs["rows"]
+
+            if self.log_path:
+                if self._log is None:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+                    self._log = open(self.log_path, 'a', encoding='utf-8', buffering=1)
+                self._log.write(json.dumps(record, default=str) + "\n")
+
+    def register_gauges(self, source, collect):
+        """Adds (or replaces) a gauge source, e.g. a connection pool; `collect()` returns [(metric, help, value)]."""
+        with self._lock:
+            self._gauges[source] = collect
+
+    def spans_for(self, trace_id):
+        with self._lock:
+            return sorted(self._traces.get(trace_id, []), key=lambda span: span["start"])
+
+    def render_prometheus(self):
+        lines = [
+            "# HELP graphleague_stage_seconds Time spent in each pipeline stage.",
+            "# TYPE graphleague_stage_seconds histogram",
+        ]
+        with self._lock:
+            for name, histogram in sorted(self._histograms.items()):
+                for bound, count in zip(BUCKETS, histogram):
+                    lines.append(f'graphleague_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+                lines.append(f'graphleague_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {histogram[len(BUCKETS)]}')
+                lines.append(f'graphleague_stage_seconds_sum{{stage="{name}"}} {histogram[-1]:.6f}')
+                lines.append(f'graphleague_stage_seconds_count{{stage="{name}"}} {histogram[len(BUCKETS)]}')
+
+            lines.append("# HELP graphleague_stage_errors_total Stages that ended in an exception.")
+            lines.append("# TYPE graphleague_stage_errors_total counter")
+            for name, count in sorted(self._errors.items()):
+                lines.append(f'graphleague_stage_errors_total{{stage="{name}"}} {count}')
+
+            lines.append("# HELP graphleague_graph_rows_total Rows returned by graph queries.")
+            lines.append("# TYPE graphleague_graph_rows_total counter")
+            for name, count in sorted(self._rows.items()):
+                lines.append(f'graphleague_graph_rows_total{{stage="{name}"}} {count}')
+            gauges = list(self._gauges.values())
+
+        # Collected outside the lock: sources take their own locks
+        for collect in gauges:
+            for metric, help_text, value in collect():
+                lines.append(f"# HELP graphleague_{metric} {help_text}")
+                lines.append(f"# TYPE graphleague_{metric} gauge")
+                lines.append(f"graphleague_{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+def get_tracer():
+    """Process-wide tracer; spans go to a JSONL log only when TRACE_LOG_PATH is set."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(log_path=os.getenv("TRACE_LOG_PATH") or None)
+        return _tracer
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        data = get_tracer().render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+_metrics_server = None
+
+def serve_metrics(port=None):
+    """Serves /metrics on METRICS_PORT for processes without the HTTP API (Streamlit, main.py)."""
+    global _metrics_server
+    port = port or os.getenv("METRICS_PORT")
+    with _tracer_lock:
+        if not port or _metrics_server is not None:
+            return _metrics_server
+        _metrics_server = ThreadingHTTPServer(("0.0.0.0", int(port)), _MetricsHandler)
+        _metrics_server.daemon_threads = True
+    threading.Thread(target=_metrics_server.serve_forever, name="metrics", daemon=True).start()
+    print(f"Metrics on :{port}/metrics")
+    return _metrics_server
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Literal, Union
+from typing import Optional, Literal, Union, List
 from backend.schemas import StrategicMechanic, ValidArchetype, ValidPosition
 
 class CounterPick(BaseModel):
@@ -51,10 +51,26 @@ class ArchetypeCounters(BaseModel):
         )
     )
     
+class TeamDraft(BaseModel):
+    intent_type: Literal["team_draft"]
+    enemy_champions: List[str] = Field(..., description="The enemy team's champions picked so far (up to 5), in Proper Casing")
+    open_roles: List[ValidPosition] = Field(
+        default_factory=list,
+        description=(
+            "Roles the user's team still has to fill. Leave empty if not stated (all roles). "
+            "Normalize each to one of: 'Top', 'Jungle', 'Mid', 'Bot', 'Support'. "
+            "Map 'ADC' or 'Marksman' -> 'Bot'. "
+            "Map 'sp' -> 'Support'."
+            "Map 'jg'/'jng' as 'Jungle'"
+        )
+    )
+    unavailable_champions: List[str] = Field(default_factory=list, description="Champions already picked by allies or banned")
+    joint: bool = Field(False, description="True if the user wants one pick for every open role as a full set, rather than options per role")
+    
 class UnknownIntent(BaseModel):
     intent_type: Literal["unknown"]
     reason: str = Field(..., description="Why the query could not be handled (e.g. 'Asking about lore/skins/stats/items'.")
     
     
 class Router(BaseModel):
-    choice: Union[CounterPick, MechanicSearch, ArchetypeCounters, UnknownIntent]
\ No newline at end of file
+    choice: Union[CounterPick, MechanicSearch, ArchetypeCounters, TeamDraft, UnknownIntent]
\ No newline at end of file
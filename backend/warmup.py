@@ -0,0 +1,36 @@
+import asyncio
+import threading
+import time
+from backend.event_loop import maybe_await, run_sync
+from backend.llm_gateway import get_client
+from backend.tracing import get_tracer
+
+async def awarm_services(graph=None):
+    """Builds the Gemini client and opens the first Neo4j connection before any query needs them.
+
+    Failures are printed, not raised: a replica whose database isn't up yet still starts,
+    and the first query retries the connection. Returns {stage: ms, or None if it failed}.
+    """
+    results = {}
+    stages = [("gemini_client", lambda: asyncio.to_thread(get_client))]
+    if hasattr(graph, "warm"):
+        stages.append(("graph", graph.warm))
+
+    with get_tracer().span("warmup") as span:
+        for name, warm in stages:
+            start = time.perf_counter()
+            try:
+                await maybe_await(warm())
+                results[name] = round((time.perf_counter() - start) * 1000, 1)
+            except Exception as e:
+                print(f"⚠️ Prewarm of {name} failed: {e}")
+                results[name] = None
+        span.set(**results)
+    return results
+
+def prewarm(graph=None):
+    """Runs awarm_services on a daemon thread; `graph` may be the sync GraphRetriever facade."""
+    graph = getattr(graph, "aio", graph)
+    thread = threading.Thread(target=lambda: run_sync(awarm_services(graph)), name="prewarm", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cold_start_budget.json')
+
+STAGES = ["interpreter_ms", "import_ms", "services_ms", "first_query_ms", "ready_ms"]
+
+# Entry point -> modules a new replica imports before it can serve
+ENTRY_POINTS = {
+    "api": ["backend.api"],
+    "pipeline": ["backend.graph_retriever", "backend.responder"],
+}
+
+# Heavy clients that must only load on first use, never while starting up
+LAZY_MODULES = ["google.genai", "neo4j"]
+
+# --update-budget records the measured medians with this much headroom (CI machines vary)
+HEADROOM = 2.0
+
+FIRST_QUERY = "Who counters Aatrox top?"
+
+def child(entry, graph_backend):
+    """Runs inside a fresh interpreter: import, build the services, answer one locally-classified query."""
+    started = time.perf_counter()
+    import importlib
+    for module in ENTRY_POINTS[entry]:
+        importlib.import_module(module)
+    imported = time.perf_counter()
+
+    from backend.graph_retriever import Switchboard, build_graph_retriever
+    from backend.responder import Responder
+    sb, graph, responder = Switchboard(), build_graph_retriever(graph_backend), Responder()
+    built = time.perf_counter()
+    loaded_at_startup = [module for module in LAZY_MODULES if module in sys.modules]
+
+    routed = sb.route(FIRST_QUERY, graph)
+    answered = time.perf_counter()
+
+    print(json.dumps({
+        "import_ms": round((imported - started) * 1000, 1),
+        "services_ms": round((built - imported) * 1000, 1),
+        "first_query_ms": round((answered - built) * 1000, 1),
+        "ready_ms": round((built - started) * 1000, 1),
+        "rows": len(routed.graph_data) if isinstance(routed.graph_data, list) else None,
+        "eager_modules": loaded_at_startup,
+    }))
+
+def measure(entry, graph_backend, runs):
+    env = dict(os.environ, TRACE_LOG_PATH="", GRAPH_BACKEND=graph_backend)
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.cold_start", "--child", "--entry", entry, "--graph", graph_backend],
+            capture_output=True, text=True, check=True, env=env,
+            cwd=os.path.abspath(os.path.join(os.path.dirname(__file__), '..')),
+        ).stdout
+        sample = json.loads(output.strip().splitlines()[-1])
+        # Process start to ready, minus what the child measured itself: the interpreter and site imports
+        sample["interpreter_ms"] = round((time.perf_counter() - started) * 1000 - sample["ready_ms"] - sample["first_query_ms"], 1)
+        samples.append(sample)
+    return samples
+
+def summarize(samples):
+    summary = {}
+    for stage in STAGES:
+        values = sorted(sample[stage] for sample in samples)
+        summary[stage] = values[len(values) // 2]
+    summary["eager_modules"] = sorted({module for sample in samples for module in sample["eager_modules"]})
+    return summary
+
+def over_budget(report, budgets):
+    failures = []
+    for entry, summary in report.items():
+        budget = budgets.get(entry, {})
+        for stage in STAGES:
+            if stage in budget and summary[stage] > budget[stage]:
+                failures.append(f"{entry}: {stage} {summary[stage]}ms > budget {budget[stage]}ms")
+        if summary["eager_modules"]:
+            failures.append(f"{entry}: {', '.join(summary['eager_modules'])} imported before the first query")
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure import time and cold start of a new replica in fresh interpreters.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--entry", choices=list(ENTRY_POINTS), action="append", help="Entry point to measure (repeatable, default all)")
+    parser.add_argument("--graph", choices=["memory", "neo4j"], default="memory")
+    parser.add_argument("--budget", default=BUDGET_FILE)
+    parser.add_argument("--check", action="store_true", help="Exit non-zero when a stage goes over its budget")
+    parser.add_argument("--update-budget", action="store_true", help=f"Record this run x{HEADROOM} as the budget")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.entry[0], args.graph)
+        sys.exit(0)
+
+    report = {}
+    for entry in args.entry or list(ENTRY_POINTS):
+        report[entry] = summarize(measure(entry, args.graph, args.runs))
+        summary = report[entry]
+        print(f"{entry:<10} " + "  ".join(f"{stage} {summary[stage]:>7}" for stage in STAGES))
+        if summary["eager_modules"]:
+            print(f"{'':<10} eager imports: {', '.join(summary['eager_modules'])}")
+
+    if args.update_budget:
+        budgets = {entry: {stage: round(summary[stage] * HEADROOM) for stage in STAGES} for entry, summary in report.items()}
+        with open(args.budget, 'w', encoding='utf-8') as f:
+            json.dump(budgets, f, indent=2)
+        print(f"Budget written to {args.budget}")
+    elif args.check:
+        with open(args.budget, 'r', encoding='utf-8') as f:
+            budgets = json.load(f)
+        failures = over_budget(report, budgets)
+        if failures:
+            print("❌ Cold start over budget:\n  " + "\n  ".join(failures))
+            sys.exit(1)
+        print("✅ Cold start within budget")
@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CORPUS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'queries.json')
+
+ANSWER = ("Pick {champion}. It wins the matchup on the strengths listed above; "
+          "play around your advantage windows and respect the listed risks. ")
+
+def load_intents(path=CORPUS_FILE):
+    # query text -> Router choice the stub classifier returns for it
+    with open(path, 'r', encoding='utf-8') as f:
+        return {entry['query']: entry['intent'] for entry in json.load(f)}
+
+class StubConfig:
+    def __init__(self, latency_ms=200.0, jitter_ms=50.0, chunk_ms=20.0, chunks=8, error_rate=0.0, error_code=503, seed=7, intents=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.chunk_ms = chunk_ms
+        self.chunks = chunks
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.intents = intents if intents is not None else load_intents()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def draw(self):
+        """Returns (delay seconds, inject an error?) from the seeded generator."""
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            return delay, fail
+
+def prompt_text(body):
+    return "".join(part.get('text', '') for content in body.get('contents', []) for part in content.get('parts', []))
+
+def function_responses(body):
+    # The functionResponse parts, i.e. the graph lookups of a tool-calling session
+    return [part['functionResponse'] for content in body.get('contents', []) for part in content.get('parts', []) if 'functionResponse' in part]
+
+def tool_calls(intent):
+    """The function calls a tool-calling model would make for a corpus intent."""
+    lane = {"my_position": intent["my_position"]} if intent.get("my_position") else {}
+    match intent["intent_type"]:
+        case "counter_pick":
+            return [{"name": "get_counter_picks", "args": {"enemy_champion": intent["enemy_champion"], **lane}}]
+        case "mechanic_search":
+            return [{"name": "find_mechanic_holders", "args": {"mechanic": intent["mechanic_concept"], **lane}}]
+        case "archetype_counter":
+            return [{"name": "get_archetype_counters", "args": {"archetype": intent["enemy_archetype"], **lane}}]
+        case "team_draft":
+            return [{"name": "get_counter_picks", "args": {"enemy_champion": enemy}} for enemy in intent["enemy_champions"]]
+    return []
+
+# First data row of an encoded context table (see backend/context_encoder.py)
+FIRST_ROW = re.compile(r"^Champion \|[^\n]*\n([^|\n]+?) \|", re.M)
+
+def prompt_tokens(body):
+    # Same 4-chars-per-token estimate as the encoder, over everything the model would read
+    return len(json.dumps([body.get('systemInstruction'), body.get('contents')])) // 4
+
+def candidate(text, prompt_token_count=0):
+    return {
+        "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": 0}],
+        "usageMetadata": {"promptTokenCount": prompt_token_count, "candidatesTokenCount": len(text.split())},
+    }
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers generateContent / streamGenerateContent like the Gemini REST API, deterministically."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        config = self.server.config
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        delay, fail = config.draw()
+        time.sleep(delay)
+        if fail:
+            return self._send_json(config.error_code, {"error": {"code": config.error_code, "message": "stub: injected error", "status": "UNAVAILABLE"}})
+
+        prompt = prompt_text(body)
+        responses = function_responses(body)
+        if body.get('tools') and not responses:
+            # First turn of a tool session: the user text is the raw query
+            calls = tool_calls(config.intents.get(prompt.strip(), {"intent_type": "unknown"}))
+            if not calls:
+                return self._send_json(200, candidate("I can only help with champion strategy questions."))
+            parts = [{"functionCall": call} for call in calls]
+            return self._send_json(200, {"candidates": [{"content": {"parts": parts, "role": "model"}, "finishReason": "STOP", "index": 0}]})
+
+        if body.get('generationConfig', {}).get('responseMimeType') == "application/json":
+            match = re.search(r"User Query: (.*)$", prompt, re.S)
+            query = match.group(1).strip() if match else ""
+            choice = config.intents.get(query, {"intent_type": "unknown", "reason": "Not in the benchmark corpus"})
+            return self._send_json(200, candidate(json.dumps({"choice": choice})))
+
+        tables = "\n".join([prompt] + [response.get('response', {}).get('table', '') for response in responses])
+        champion = FIRST_ROW.search(tables)
+        text = ANSWER.format(champion=champion.group(1) if champion else "a safe blind pick")
+        tokens = prompt_tokens(body)
+        if ":streamGenerateContent" not in self.path:
+            return self._send_json(200, candidate(text, tokens))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        words = text.split(" ")
+        size = max(1, len(words) // config.chunks)
+        for i in range(0, len(words), size):
+            chunk = " ".join(words[i:i + size]) + " "
+            self.wfile.write(f"data: {json.dumps(candidate(chunk, tokens))}\r\n\r\n".encode('utf-8'))
+            self.wfile.flush()
+            time.sleep(config.chunk_ms / 1000)
+        self.close_connection = True
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops SYNs under load and adds 1s retransmits to the tail
+    request_queue_size = 128
+
+def start_stub(config, host="127.0.0.1", port=0):
+    """Starts the stub on a daemon thread; returns (server, base_url)."""
+    server = StubServer((host, port), StubHandler)
+    server.config = config
+    threading.Thread(target=server.serve_forever, name="gemini-stub", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deterministic local stand-in for the Gemini API.")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-code", type=int, default=503)
+    args = parser.parse_args()
+
+    server, url = start_stub(StubConfig(args.latency_ms, args.jitter_ms, error_rate=args.error_rate, error_code=args.error_code), port=args.port)
+    print(f"Gemini stub on {url} (set GOOGLE_GEMINI_BASE_URL={url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
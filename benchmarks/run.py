@@ -0,0 +1,190 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.gemini_stub import CORPUS_FILE, StubConfig, load_intents, start_stub
+from backend.llm_gateway import percentile
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+STAGES = ["classify_ms", "graph_ms", "ttft_ms", "respond_ms", "end_to_end_ms"]
+
+# Knobs that change the numbers; a baseline is only comparable when these match
+CONFIG_KEYS = ["concurrency", "requests", "graph", "latency_ms", "jitter_ms", "error_rate", "local_parser", "cache", "mode", "responder"]
+
+async def run_one(sb, graph, responder, query, agent=None):
+    """One query through the same path as main.py: route (classify -> graph), then stream the answer."""
+    sample = {"query": query, "error": None}
+    started = time.perf_counter()
+    try:
+        if agent is not None:
+            routed, stream = await agent.aanswer(query, graph)
+        else:
+            routed = await sb.aroute(query, graph)
+            stream = None
+        sample.update(routed.timings)
+        if routed.intent is None:
+            sample["error"] = "classify"
+        elif routed.graph_data != "NA" and not routed.suggestions:
+            respond_started = time.perf_counter()
+            if stream is None:
+                stream = responder.stream_response(routed.graph_data, routed.context, query, intent=routed.intent, trace_id=routed.trace_id)
+            async for _ in stream:
+                pass
+            sample["ttft_ms"] = stream.timings()["ttft_ms"]
+            sample["prompt_tokens"] = stream.prompt_stats.get("prompt_tokens")
+            sample["respond_ms"] = round((time.perf_counter() - respond_started) * 1000, 2)
+            if not stream.text:
+                sample["error"] = "respond"
+    except Exception as e:
+        sample["error"] = type(e).__name__
+    sample["end_to_end_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return sample
+
+async def replay(queries, total, concurrency, sb, graph, responder, agent=None):
+    slots = asyncio.Semaphore(concurrency)
+
+    async def worker(i):
+        async with slots:
+            return await run_one(sb, graph, responder, queries[i % len(queries)], agent)
+
+    started = time.perf_counter()
+    samples = await asyncio.gather(*(worker(i) for i in range(total)))
+    return samples, time.perf_counter() - started
+
+def summarize(samples, elapsed):
+    stages = {}
+    for stage in STAGES:
+        values = [s[stage] for s in samples if s.get(stage) is not None and not s["error"]]
+        stages[stage] = {
+            "count": len(values),
+            "p50": percentile(values, 0.50),
+            "p95": percentile(values, 0.95),
+            "p99": percentile(values, 0.99),
+        }
+
+    tokens = [s["prompt_tokens"] for s in samples if s.get("prompt_tokens") is not None]
+    errors = {}
+    for s in samples:
+        if s["error"]:
+            errors[s["error"]] = errors.get(s["error"], 0) + 1
+    return {
+        "stages": stages,
+        "throughput_qps": round(len(samples) / elapsed, 2),
+        "error_rate": round(sum(errors.values()) / len(samples), 4),
+        "errors": errors,
+        "prompt_tokens_mean": round(sum(tokens) / len(tokens), 1) if tokens else None,
+    }
+
+def regressions(result, baseline, tolerance, slack_ms):
+    """Stages whose p95 grew, throughput that dropped, or an error rate that rose beyond the tolerance.
+
+    slack_ms keeps sub-millisecond stages (local parse, in-memory graph) from flagging on noise.
+    """
+    found = []
+    for stage, stats in baseline["stages"].items():
+        before, after = stats.get("p95"), result["stages"].get(stage, {}).get("p95")
+        if before is not None and after is not None and after > before * (1 + tolerance) + slack_ms:
+            found.append(f"{stage} p95 {before}ms -> {after}ms")
+    if result["throughput_qps"] < baseline["throughput_qps"] * (1 - tolerance):
+        found.append(f"throughput {baseline['throughput_qps']} -> {result['throughput_qps']} q/s")
+    if result["error_rate"] > baseline["error_rate"] + 0.01:
+        found.append(f"error rate {baseline['error_rate']} -> {result['error_rate']}")
+    return found
+
+def print_report(config, result):
+    print(f"\n{config['requests']} requests, concurrency {config['concurrency']}, graph={config['graph']}, "
+          f"stub latency {config['latency_ms']}±{config['jitter_ms']}ms, error rate {config['error_rate']}")
+    print(f"{'stage':<16}{'n':>6}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for stage, stats in result["stages"].items():
+        cells = [f"{stats[q]:.1f}" if stats[q] is not None else "-" for q in ("p50", "p95", "p99")]
+        print(f"{stage:<16}{stats['count']:>6}" + "".join(f"{c:>10}" for c in cells))
+    print(f"throughput {result['throughput_qps']} q/s · error rate {result['error_rate']} {result['errors'] or ''}")
+    if result.get("prompt_tokens_mean") is not None:
+        print(f"answer prompt tokens (mean) {result['prompt_tokens_mean']}")
+    if result.get("llm_calls_per_query") is not None:
+        print(f"LLM calls per query {result['llm_calls_per_query']}")
+
+async def main(args):
+    intents = load_intents(args.corpus)
+    stub_config = StubConfig(args.latency_ms, args.jitter_ms, error_rate=args.error_rate, seed=args.seed, intents=intents)
+    _, url = start_stub(stub_config)
+
+    # Clients are created after this, so every Gemini call goes to the stub
+    os.environ["GOOGLE_GEMINI_BASE_URL"] = url
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+    from backend.graph_retriever import Switchboard, build_async_graph_retriever
+    from backend.responder import Responder
+    from backend.event_loop import maybe_await
+
+    sb = Switchboard(use_local_parser=args.local_parser, use_cache=args.cache)
+    graph = build_async_graph_retriever(args.graph)
+    responder = Responder(use_cache=args.cache, mode=args.responder)
+    agent = None
+    if args.mode == "tools":
+        from backend.tool_agent import ToolAgent
+        agent = ToolAgent(sb, responder)
+    queries = list(intents)
+
+    if args.warmup:
+        await replay(queries, args.warmup, args.concurrency, sb, graph, responder, agent)
+    calls_before = stub_config.requests
+    samples, elapsed = await replay(queries, args.requests, args.concurrency, sb, graph, responder, agent)
+    await maybe_await(graph.close())
+    result = summarize(samples, elapsed)
+    result["llm_calls_per_query"] = round((stub_config.requests - calls_before) / len(samples), 2)
+    return result, stub_config
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay the query corpus through the pipeline against a Gemini stub.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--graph", choices=["memory", "neo4j"], default="memory", help="Graph backend (neo4j needs NEO4J_* set and a seeded DB)")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Stub time to first byte")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub calls that return a 503")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-local-parser", dest="local_parser", action="store_false", help="Send every query to the (stub) LLM classifier")
+    parser.add_argument("--mode", choices=["classic", "tools"], default="classic", help="classic: classify then respond; tools: one tool-calling session")
+    parser.add_argument("--responder", choices=["llm", "template", "auto"], default="llm", help="template: answers from templates, no Gemini call; auto: templates when Gemini fails or is slow")
+    parser.add_argument("--cache", action="store_true", help="Enable the intent/response caches (off so every request does the full path)")
+    parser.add_argument("--corpus", default=CORPUS_FILE)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if results regress against the baseline")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression for p95 and throughput")
+    parser.add_argument("--slack-ms", type=float, default=5.0, help="Absolute p95 slack on top of the tolerance")
+    parser.add_argument("--output", help="Also write the results JSON here")
+    args = parser.parse_args()
+
+    result, stub = asyncio.run(main(args))
+    config = {key: getattr(args, key) for key in CONFIG_KEYS}
+    report = {"config": config, **result}
+    print_report(config, result)
+    print(f"stub served {stub.requests} calls, injected {stub.errors} errors")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    elif args.check:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline["config"] != config:
+            print(f"⚠️ Baseline was recorded with {baseline['config']}; comparing anyway")
+        found = regressions(result, baseline, args.tolerance, args.slack_ms)
+        if found:
+            print("❌ Regressions vs baseline:\n  " + "\n  ".join(found))
+            sys.exit(1)
+        print("✅ Within baseline tolerance")
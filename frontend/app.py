@@ -5,8 +5,6 @@ import os
 # 1. Add the parent directory to sys.path so we can import backend
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from backend.graph_retriever import Switchboard, GraphRetriever
-from backend.responder import Responder
 
 # 2. Page Config & Styling
 st.set_page_config(
@@ -27,16 +25,64 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # 3. Initialize Services (Cached to run once)
+# With API_URL set the app is a thin client of backend/api.py; otherwise it runs the pipeline in-process
+API_URL = os.getenv("API_URL")
+
 @st.cache_resource
 def get_services():
-    return Switchboard(), GraphRetriever(), Responder()
+    if API_URL:
+        from frontend.client import ApiClient
+        return ApiClient(API_URL), None, None, None, None
+    from backend.graph_retriever import Switchboard, build_graph_retriever
+    from backend.responder import Responder
+    from backend.tool_agent import ToolAgent, pipeline_mode
+    from backend.tracing import serve_metrics
+    from backend.warmup import prewarm
+    serve_metrics()
+    # Construction does no network I/O; the Gemini client and the first Neo4j connection are warmed in the background
+    sb, graph, responder = Switchboard(), build_graph_retriever(), Responder()
+    prewarm(graph)
+    agent = ToolAgent(sb, responder) if pipeline_mode() == "tools" else None
+    return None, sb, graph, responder, agent
 
 try:
-    sb, graph, responder = get_services()
+    api, sb, graph, responder, agent = get_services()
 except Exception as e:
     st.error(f"❌ Failed to connect to backend: {e}")
     st.stop()
 
+def ask(user_query):
+    """Returns (routed query, answer stream or None when the query was rejected)."""
+    # Instant answers are written from templates, without a Gemini call
+    mode = "template" if st.session_state.get("instant_answers") else None
+    if api is not None:
+        return api.ask(user_query, responder=mode)
+    if agent is not None:
+        return agent.answer(user_query, graph, mode=mode)
+    routed = sb.route(user_query, graph)
+    if routed.graph_data == "NA" or routed.suggestion_text:
+        return routed, None
+    return routed, responder.stream_response(routed.graph_data, routed.context, user_query, intent=routed.intent, trace_id=routed.trace_id, mode=mode)
+
+def trace_spans(routed, stream):
+    """Spans of the last query: sent back by the API, or read from the in-process tracer."""
+    if api is not None:
+        return (stream.spans if stream is not None else None) or routed.spans or []
+    from backend.tracing import get_tracer
+    return get_tracer().spans_for(routed.trace_id)
+
+def service_stats():
+    if api is not None:
+        try:
+            return api.stats()
+        except Exception:
+            return {}
+    return {
+        "local_parser": sb.local_parser.stats() if sb.local_parser is not None else None,
+        "intent_cache": sb.intent_cache.stats() if sb.intent_cache is not None else None,
+        "gateway": sb.gateway.stats(),
+    }
+
 # 4. Sidebar: Logo & Controls
 # Requires Streamlit 1.35+ for st.logo
 try:
@@ -63,7 +109,67 @@ with st.sidebar:
         st.cache_resource.clear()
         st.rerun()
 
-# 5. Chat History
+    st.toggle("⚡ Instant answers (no Gemini)", key="instant_answers")
+    st.toggle("🧪 Debug panel", key="debug_panel")
+
+    stats = service_stats()
+    if api is not None:
+        st.caption(f"🌐 API: {API_URL} (worker {stats.get('worker_pid', '?')})")
+    if stats.get("local_parser"):
+        parser_stats = stats["local_parser"]
+        st.caption(f"⚡ Local intent hits: {parser_stats['hits']}/{parser_stats['queries']} ({parser_stats['avg_latency_us']}µs avg)")
+    if stats.get("intent_cache"):
+        cache_stats = stats["intent_cache"]
+        st.caption(f"🗂️ Intent cache hits: {cache_stats['hits']} / misses: {cache_stats['misses']}")
+    if stats.get("gateway"):
+        gateway_stats = stats["gateway"]
+        st.caption(f"🔌 Gemini circuit: {gateway_stats['breaker_state']} · p99 {gateway_stats['latency_p99_ms']}ms · retries {gateway_stats['retries']}")
+
+# 5. Strategic Insight Cards
+def render_insight_cards(graph_data):
+    # Display cards only if we have data
+    if not isinstance(graph_data, list) or len(graph_data) == 0:
+        return
+
+    st.write("") 
+    st.subheader("📊 Strategic Insights")
+    
+    cols = st.columns(min(len(graph_data), 3))
+    
+    for idx, item in enumerate(graph_data):
+        # Limit columns to 3 to prevent squishing
+        if idx > 2: break
+            
+        with cols[idx]:
+            with st.container(border=True):
+                # 1. Header & Score
+                st.subheader(f"⚔️ {item.get('Champion')}")
+                
+                # Optional Metadata Display
+                if 'Role' in item:
+                    st.caption(f"Role: {item.get('Role')}")
+                if 'Score' in item:
+                    st.markdown(f"**Advantage Score:** `{item.get('Score')}`")
+                elif 'Class' in item:
+                    st.caption(f"Archetype: {item.get('Class')}")
+
+                st.divider()
+                
+                # 2. Reasoning (Now Uniform across all types)
+                # It works for Tools (Mechanics), Strategies (Archetypes), and Counter Reasons
+                if item.get('Reasoning'):
+                    st.markdown("**:green[Why it works:]**")
+                    for reason in item['Reasoning']:
+                        st.markdown(f"- {reason}")
+
+                # 3. Risks (Only displays if the key exists)
+                if item.get('Risks'):
+                    st.write("") # Spacer
+                    st.markdown("**:red[Risks:]**")
+                    for risk in item['Risks']:
+                        st.caption(f"⚠️ {risk}")
+
+# 6. Chat History
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
@@ -72,7 +178,7 @@ for message in st.session_state.messages:
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
 
-# 6. Input Handling (Check Chat Input OR Button Click)
+# 7. Input Handling (Check Chat Input OR Button Click)
 user_input = st.chat_input("Ask about counters, mechanics, or strategy...")
 
 # If a sidebar button was clicked, override the input
@@ -89,70 +195,56 @@ if user_input:
 
     # 2. Generate AI Response
     with st.chat_message("assistant"):
-        with st.spinner("⚔️ Consulting the Archives..."):
-            try:
-                # --- A. QUERY PROCESSING ---
-                graph_data, context_str = sb.handle_query(user_input, graph)
-
-                # --- B. ERROR HANDLING (The "NA" Check) ---
-                if graph_data == "NA":
-                    # Hard stop for irrelevant queries
-                    error_msg = "I can only answer questions about League of Legends strategy, counters, and mechanics."
-                    st.warning(error_msg)
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
-                
-                else:
-                    # --- C. VALID QUERY -> GENERATE RESPONSE ---
-                    # Even if graph_data is empty [], we let Gemini explain that.
-                    full_response = responder.generate_response(graph_data, context_str, user_input)
-                    
-                    if full_response and full_response.text:
-                        st.markdown(full_response.text)
-                        st.session_state.messages.append({"role": "assistant", "content": full_response.text})
+        try:
+            # --- A. QUERY PROCESSING ---
+            with st.spinner("⚔️ Consulting the Archives..."):
+                routed, stream = ask(user_input)
+                graph_data, context_str = routed.graph_data, routed.context
+
+            # --- B. ERROR HANDLING (The "NA" Check) ---
+            if graph_data == "NA":
+                # Hard stop for irrelevant queries
+                error_msg = "I can only answer questions about League of Legends strategy, counters, and mechanics."
+                st.warning(error_msg)
+                st.session_state.messages.append({"role": "assistant", "content": error_msg})
+
+            # Misspelled/unknown champion: answer with suggestions, no Gemini call
+            elif routed.suggestion_text:
+                st.info(routed.suggestion_text)
+                st.session_state.messages.append({"role": "assistant", "content": routed.suggestion_text})
+            
+            else:
+                # Reserve the answer slot above the cards, then draw the cards straight from graph data
+                answer_box = st.container()
+                render_insight_cards(graph_data)
+
+                # --- C. VALID QUERY -> STREAM RESPONSE ---
+                # Even if graph_data is empty [], we let Gemini explain that.
+                with answer_box:
+                    st.write_stream(stream)
+
+                    if stream.text:
+                        st.session_state.messages.append({"role": "assistant", "content": stream.text})
+                        timings = stream.timings()
+                        st.caption(f"⏱️ First token {timings['ttft_ms']}ms · total {timings['total_ms']}ms")
                     else:
                         st.error("⚠️ The Coach is silent (Gemini API Error).")
 
-                    # --- D. VISUALIZATION CARDS ---
-                    # Display cards only if we have data
-                    if isinstance(graph_data, list) and len(graph_data) > 0:
-                        st.write("") 
-                        st.subheader("📊 Strategic Insights")
-                        
-                        cols = st.columns(min(len(graph_data), 3))
-                        
-                        for idx, item in enumerate(graph_data):
-                            # Limit columns to 3 to prevent squishing
-                            if idx > 2: break
-                                
-                            with cols[idx]:
-                                with st.container(border=True):
-                                    # 1. Header & Score
-                                    st.subheader(f"⚔️ {item.get('Champion')}")
-                                    
-                                    # Optional Metadata Display
-                                    if 'Score' in item:
-                                        st.markdown(f"**Advantage Score:** `{item.get('Score')}`")
-                                    elif 'Class' in item:
-                                        st.caption(f"Archetype: {item.get('Class')}")
-
-                                    st.divider()
-                                    
-                                    # 2. Reasoning (Now Uniform across all types)
-                                    # It works for Tools (Mechanics), Strategies (Archetypes), and Counter Reasons
-                                    if item.get('Reasoning'):
-                                        st.markdown("**:green[Why it works:]**")
-                                        for reason in item['Reasoning']:
-                                            st.markdown(f"- {reason}")
-
-                                    # 3. Risks (Only displays if the key exists)
-                                    if item.get('Risks'):
-                                        st.write("") # Spacer
-                                        st.markdown("**:red[Risks:]**")
-                                        for risk in item['Risks']:
-                                            st.caption(f"⚠️ {risk}")
-
-            except Exception as e:
-                st.error(f"Error during processing: {e}")
-                # Print full traceback to console for debugging
-                import traceback
-                traceback.print_exc()
\ No newline at end of file
+            st.session_state["last_spans"] = trace_spans(routed, stream)
+
+        except Exception as e:
+            st.error(f"Error during processing: {e}")
+            # Print full traceback to console for debugging
+            import traceback
+            traceback.print_exc()
+
+# 8. Debug Panel: per-stage breakdown of the last query
+if st.session_state.get("debug_panel") and st.session_state.get("last_spans"):
+    with st.sidebar.expander("⏱️ Last query breakdown", expanded=True):
+        st.dataframe(
+            [
+                {"stage": span["name"], "ms": span["duration_ms"], "status": span["status"], "details": ", ".join(f"{k}={v}" for k, v in span["attrs"].items())}
+                for span in st.session_state["last_spans"]
+            ],
+            hide_index=True,
+        )
@@ -0,0 +1,80 @@
+import json
+import time
+from dataclasses import dataclass
+from typing import Any
+import httpx
+
+@dataclass
+class RemoteRoute:
+    # Same fields the app reads from backend.graph_retriever.RoutedQuery; intent is the plain dict
+    intent: Any
+    graph_data: Any
+    context: str
+    trace_id: str = None
+    spans: list = None
+    suggestion_text: str = None
+
+class RemoteStream:
+    """Iterates the text chunks of an /answer/stream response, mirroring backend ResponseStream."""
+    def __init__(self, response, lines):
+        self._response = response
+        self._lines = lines
+        self.started = time.perf_counter()
+        self.text = ""
+        self.ttft = None
+        self.server_timings = None
+        self.spans = None
+
+    def __iter__(self):
+        parts = []
+        try:
+            for line in self._lines:
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event["type"] == "chunk":
+                    if self.ttft is None:
+                        self.ttft = time.perf_counter() - self.started
+                    parts.append(event["text"])
+                    yield event["text"]
+                elif event["type"] == "done":
+                    self.server_timings = event.get("timings")
+                    self.spans = event.get("spans")
+        finally:
+            self.text = "".join(parts)
+            self._response.close()
+
+    def timings(self):
+        # Server-side timings when the stream finished cleanly, else what the client measured
+        if self.server_timings:
+            return self.server_timings
+        return {"ttft_ms": round(self.ttft * 1000, 1) if self.ttft is not None else None, "total_ms": None}
+
+class ApiClient:
+    """Thin HTTP client for backend/api.py, so the UI holds no Neo4j or Gemini connections."""
+    def __init__(self, base_url, timeout=60.0):
+        self.http = httpx.Client(base_url=base_url.rstrip("/"), timeout=timeout)
+
+    def close(self):
+        self.http.close()
+
+    def stats(self):
+        response = self.http.get("/stats")
+        response.raise_for_status()
+        return response.json()
+
+    def ask(self, user_query, responder=None):
+        """Returns (RemoteRoute, RemoteStream or None). The route arrives before any answer text."""
+        request = self.http.build_request("POST", "/answer/stream", json={"query": user_query, "responder": responder})
+        response = self.http.send(request, stream=True)
+        response.raise_for_status()
+
+        lines = response.iter_lines()
+        event = json.loads(next(lines))
+        routed = RemoteRoute(event["intent"], event["graph_data"], event["context"], event.get("trace_id"), suggestion_text=event.get("suggestion_text"))
+        if routed.graph_data == "NA" or routed.suggestion_text:
+            done = json.loads(next(lines, "{}") or "{}")
+            routed.spans = done.get("spans")
+            response.close()
+            return routed, None
+        return routed, RemoteStream(response, lines)
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from backend.llm_gateway import CircuitOpenError, DeadlineExceeded, LLMGateway
+
+def half_open_gateway():
+    gateway = LLMGateway(max_concurrency=1, failure_threshold=1, reset_timeout=0)
+    gateway.breaker.record_failure()
+    return gateway
+
+def test_half_open_with_every_slot_taken():
+    gateway = half_open_gateway()
+    gateway._thread_slots.acquire()
+    with pytest.raises(DeadlineExceeded):
+        gateway.call(lambda: "late", deadline=0.05)
+    gateway._thread_slots.release()
+
+    # The slot timeout never started a probe, so the next call is let through
+    assert gateway.call(lambda: "ok") == "ok"
+    assert gateway.breaker.state == "closed"
+
+def test_open_circuit_releases_the_slot():
+    gateway = LLMGateway(max_concurrency=1, failure_threshold=1, reset_timeout=60)
+    gateway.breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        gateway.call(lambda: "ok")
+    assert gateway._thread_slots.acquire(timeout=0)
+
+def test_async_half_open_with_every_slot_taken():
+    async def main():
+        gateway = half_open_gateway()
+        slots = gateway._async_slots()
+        await slots.acquire()
+        with pytest.raises(DeadlineExceeded):
+            await gateway.acall(lambda: asyncio.sleep(0, "late"), deadline=0.05)
+        slots.release()
+        assert await gateway.acall(lambda: asyncio.sleep(0, "ok")) == "ok"
+        return gateway.breaker.state
+
+    assert asyncio.run(main()) == "closed"
+
+def test_async_queueing_does_not_open_the_circuit():
+    async def main():
+        gateway = LLMGateway(max_concurrency=1, failure_threshold=1)
+        slots = gateway._async_slots()
+        await slots.acquire()
+        with pytest.raises(DeadlineExceeded):
+            await gateway.acall(lambda: asyncio.sleep(0), deadline=0.05)
+        return gateway.breaker.state, gateway.metrics["deadline_exceeded"]
+
+    assert asyncio.run(main()) == ("closed", 1)
+
+def test_async_upstream_timeout_opens_the_circuit():
+    async def main():
+        gateway = LLMGateway(max_concurrency=1, failure_threshold=1)
+        with pytest.raises(DeadlineExceeded):
+            await gateway.acall(lambda: asyncio.sleep(1), deadline=0.05)
+        return gateway.breaker.state
+
+    assert asyncio.run(main()) == "open"
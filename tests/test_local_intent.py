@@ -0,0 +1,42 @@
+import pytest
+from backend import user_intent
+from backend.local_intent import LocalIntentParser
+
+CHAMPIONS = [{"name": name} for name in ("Darius", "Zed", "Garen", "Lee Sin", "Aatrox")]
+
+@pytest.fixture(scope="module")
+def parser():
+    return LocalIntentParser(champions=CHAMPIONS)
+
+@pytest.mark.parametrize("query, enemy, position", [
+    ("Who counters Aatrox top?", "Aatrox", "Top"),
+    ("what beats zed mid", "Zed", "Mid"),
+    ("counter pick vs Darius", "Darius", None),
+    ("what should I pick into lee sin jungle", "Lee Sin", "Jungle"),
+])
+def test_counter_pick(parser, query, enemy, position):
+    intent = parser.parse(query)
+    assert isinstance(intent, user_intent.CounterPick)
+    assert (intent.enemy_champion, intent.my_position) == (enemy, position)
+
+@pytest.mark.parametrize("query", [
+    # The champion is the subject: who it counters, not who counters it
+    "Who does Darius counter?",
+    "what does zed counter mid",
+    "Darius counters who?",
+    "who is Garen good against",
+    # Ban and negated questions
+    "who should I ban against zed",
+    "when should I not pick against zed",
+    "don't pick into Darius",
+])
+def test_left_to_llm(parser, query):
+    assert parser.parse(query) is None
+
+def test_mechanic_search(parser):
+    intent = parser.parse("Which supports have anti-heal?")
+    assert isinstance(intent, user_intent.MechanicSearch)
+    assert (intent.mechanic_concept, intent.my_position) == ("Grievous Wounds", "Support")
+
+def test_negated_mechanic_search(parser):
+    assert parser.parse("supports without anti-heal") is None
@@ -0,0 +1,32 @@
+import pytest
+from backend import user_intent
+from backend.graph_retriever import Switchboard
+from backend.llm_gateway import LLMGateway
+from backend.memory_retriever import InMemoryGraphRetriever
+from backend.responder import Responder
+from backend.tool_agent import ToolAgent
+
+@pytest.fixture
+def agent():
+    sb = Switchboard(use_cache=False)
+    responder = Responder(use_cache=False, mode="auto")
+    agent = ToolAgent(sb, responder)
+    agent.gateway = LLMGateway(failure_threshold=1, reset_timeout=60)
+    agent.gateway.breaker.record_failure()
+    return agent
+
+def test_planning_outage_falls_back_to_the_template(agent, monkeypatch):
+    async def classify(user_query):
+        return user_intent.CounterPick(intent_type="counter_pick", enemy_champion="Zed", my_position="Mid")
+    monkeypatch.setattr(agent.switchboard, "aclassify_intent", classify)
+
+    routed, stream = agent.answer("what's good into zed's ult mid", InMemoryGraphRetriever())
+    assert isinstance(routed.intent, user_intent.CounterPick)
+    assert "Best picks into **Zed**" in "".join(stream)
+    assert agent.metrics["fallbacks"] == 1
+
+def test_planning_outage_without_an_intent(agent):
+    # The classifier shares the outage, so nothing can be routed, but nothing raises either
+    agent.switchboard.gateway = agent.gateway
+    routed, stream = agent.answer("what's good into zed's ult mid", InMemoryGraphRetriever())
+    assert (routed.graph_data, stream) == ("NA", None)